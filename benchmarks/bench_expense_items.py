@@ -0,0 +1,71 @@
+"""Benchmark: parsing + validating fill_expense_report items at 10 / 100 / 10k items.
+
+Compares the original json.loads with unvalidated dict access against the
+compiled TypeAdapter schema (validate_json, and orjson/json + validate_python
+for reference).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_expense_items [--sizes 10 100 10000]
+"""
+import argparse
+import json
+import time
+
+from schemas.expense_models import EXPENSE_ITEMS_ADAPTERS, validate_expense_items
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+def make_items(count: int) -> str:
+    categories = ["Meals", "交通", "entertainment", "医疗费", "Communication"]
+    return json.dumps([
+        {"date": "2025-01-15", "details": f"expense {i}", "category": categories[i % len(categories)], "amount": 10.0 + i}
+        for i in range(count)
+    ])
+
+
+def unvalidated(raw: str):
+    """What the tool did before: json.loads and item.get(...) per field"""
+    return [
+        (item.get("date", ""), item.get("details", ""), item.get("category", ""), item.get("amount", 0))
+        for item in json.loads(raw)
+    ]
+
+
+def timed(fn, raw: str, repeat: int) -> float:
+    fn(raw)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(raw)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 10000])
+    args = parser.parse_args()
+
+    adapter = EXPENSE_ITEMS_ADAPTERS["local"]
+    variants = [
+        ("json.loads, no validation", unvalidated),
+        ("TypeAdapter.validate_json", adapter.validate_json),
+        ("json.loads + validate_python", lambda raw: adapter.validate_python(json.loads(raw))),
+    ]
+    if orjson is not None:
+        variants.append(("orjson.loads + validate_python", lambda raw: adapter.validate_python(orjson.loads(raw))))
+    variants.append(("validate_expense_items (tool path)", lambda raw: validate_expense_items(raw, "local")))
+
+    for size in args.sizes:
+        raw = make_items(size)
+        repeat = max(5, 20000 // size)
+        print(f"{size} items ({len(raw)} bytes), mean of {repeat} runs")
+        for label, fn in variants:
+            elapsed = timed(fn, raw, repeat)
+            print(f"  {label:<36} {elapsed * 1e6:10.1f} us  {elapsed * 1e6 / size:7.2f} us/item")
+
+
+if __name__ == "__main__":
+    main()
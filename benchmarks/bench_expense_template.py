@@ -0,0 +1,77 @@
+"""Benchmark: re-parsing the expense template per report vs. cloning the cached master.
+
+Reports per-report latency (load + fill + save) and process RSS.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_expense_template [--reports 50] [--items 30]
+"""
+import argparse
+import io
+import resource
+import time
+
+import openpyxl
+
+from reports.expense_report import TEMPLATE_PATH
+from reports.template_cache import TemplateCache
+
+
+def rss_mb() -> float:
+    """Current resident set size (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fill(wb, items: int):
+    ws = wb["报销表格_本地"]
+    ws["B5"] = "Benchmark"
+    ws["B6"] = "2025-Jan"
+    for i in range(items):
+        row = 9 + i
+        ws[f"A{row}"] = "2025-01-15"
+        ws[f"B{row}"] = f"item {i}"
+        ws[f"C{row}"] = "餐食"
+        ws[f"D{row}"] = 10.0 + i
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer
+
+
+def run(label: str, open_template, reports: int, items: int):
+    fill(open_template(), items)  # warm-up
+    rss_before = rss_mb()
+    latencies = []
+    for _ in range(reports):
+        started = time.perf_counter()
+        fill(open_template(), items)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<18} mean {mean * 1000:8.2f} ms  p95 {p95 * 1000:8.2f} ms  "
+          f"RSS {rss_mb():7.1f} MB ({rss_mb() - rss_before:+.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--items", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{args.reports} reports x {args.items} rows, baseline RSS {rss_mb():.1f} MB")
+    run("load_workbook", lambda: openpyxl.load_workbook(TEMPLATE_PATH), args.reports, args.items)
+
+    cache = TemplateCache(TEMPLATE_PATH)
+    cache.warm()
+    run("cached clone", cache.get, args.reports, args.items)
+    print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
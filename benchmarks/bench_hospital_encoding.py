@@ -0,0 +1,126 @@
+"""Benchmark: hospital tool response encoding time and payload bytes per output mode.
+
+Every tool runs once against a temporary database seeded with extra doctors
+and appointments, and its result dict is captured. Each HOSPITAL_OUTPUT_MODE
+then encodes that dict. The byte counts are what goes into the tool result:
+text plus the structured copy, where there is one. "pretty (before)" is the
+original indented text together with the {"result": text} copy FastMCP added
+when the tools still had the default str output schema.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hospital_encoding [--doctors 200] [--appointments 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import hospital_mcp_server
+from db.async_db import async_hospital_db
+from db.hospital_db import HospitalDatabase
+from utils.encoding import ResponseEncoder, dumps, orjson
+
+TOOL_CALLS = [
+    ("hospital_list_specialties", {}),
+    ("hospital_list_doctors", {}),
+    ("hospital_get_doctor_schedule", {"doctor_id": "D008"}),
+    ("hospital_find_available_slots", {"specialty": "Internal Medicine", "limit": 20}),
+    ("hospital_get_schedules", {"specialty": "Internal Medicine"}),
+    ("hospital_get_patient_info", {"query": "Alice Wong"}),
+    ("hospital_get_patient_appointments", {"patient_name": "Alice Wong"}),
+]
+
+
+class CapturingEncoder(ResponseEncoder):
+    def __init__(self):
+        super().__init__("compact")
+        self.captured = None
+
+    def encode(self, data):
+        self.captured = data
+        return super().encode(data)
+
+
+def seed(database: HospitalDatabase, doctors: int, appointments: int):
+    specialties = [row[0] for row in database.get_specialties()]
+    with database.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO doctors VALUES (?,?,?,?,?,?,?,?)",
+            [(f"X{n:04d}", f"Dr. Extra {n}", specialties[n % len(specialties)], "Attending Physician",
+              "City Central Hospital", "Mon,Tue,Wed,Thu,Fri", "08:00-12:00,14:00-17:00", 150.0)
+             for n in range(doctors)],
+        )
+        today = date.today()
+        conn.executemany(
+            "INSERT INTO appointments VALUES (?,?,?,?,?,?,?,?,?)",
+            [(str(uuid.uuid4()), "P001", f"X{n % max(doctors, 1):04d}", str(today - timedelta(days=n // 4 + 1)),
+              f"{9 + n % 4:02d}:00", "completed", "Follow-up visit", datetime.now().isoformat(), "Stable")
+             for n in range(appointments)],
+        )
+    database.invalidate_reference_cache()
+
+
+async def capture_payloads():
+    tools = await hospital_mcp_server.mcp_hospital.get_tools()
+    capture = CapturingEncoder()
+    hospital_mcp_server.response_encoder = capture
+    payloads = []
+    for name, args in TOOL_CALLS:
+        capture.captured = None
+        await tools[name].fn(**args)
+        if capture.captured is not None:
+            payloads.append((name, capture.captured))
+    return payloads
+
+
+def wire_bytes(response) -> int:
+    if isinstance(response, str):
+        return len(response.encode())
+    text = "".join(block.text for block in response.content)
+    return len(text.encode()) + len(dumps(response.structured_content).encode())
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=200, help="extra doctors to seed")
+    parser.add_argument("--appointments", type=int, default=200, help="extra past appointments for Alice Wong")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    database = HospitalDatabase(os.path.join(tempfile.mkdtemp(), "hospital.sqlite3"))
+    seed(database, args.doctors, args.appointments)
+    async_hospital_db.database = database
+    payloads = asyncio.run(capture_payloads())
+
+    variants = [
+        ("pretty (before)", lambda data: json.dumps(
+            {"result": json.dumps(data, ensure_ascii=False, indent=2)}, ensure_ascii=False)),
+        ("compact (stdlib json)", lambda data: json.dumps(data, ensure_ascii=False, separators=(",", ":"))),
+    ] + [(mode, ResponseEncoder(mode).encode) for mode in ("pretty", "compact", "columnar", "structured")]
+
+    print(f"serializer: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    for name, data in payloads:
+        print(name)
+        for label, encode in variants:
+            elapsed = timed(lambda: encode(data), args.repeat)
+            size = wire_bytes(encode(data))
+            if label == "pretty (before)":
+                size += len(json.dumps(data, ensure_ascii=False, indent=2).encode())
+            print(f"  {label:<22} {elapsed * 1e6:9.1f} us  {size:9d} bytes")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: per-row product lookups vs. the joined get_user_investment_details() query.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_investments [--investments 2000] [--repeat 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from db.database import Database
+
+
+def seed(db: Database, account_id: str, count: int):
+    products = ["FP001", "FP002", "FP003"]
+    now = datetime.now()
+    rows = [
+        (
+            str(uuid.uuid4()), account_id, products[i % len(products)], 1000.0 + i,
+            (now - timedelta(minutes=i)).isoformat(), (now + timedelta(days=30)).isoformat(), "active",
+        )
+        for i in range(count)
+    ]
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO user_investments (id, account_id, product_id, investment_amount, investment_date, "
+            "expected_maturity_date, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def n_plus_one_uncached(db: Database, account_id: str):
+    """The original tool path: one product query per investment row"""
+    return [
+        (investment, db._load_financial_product(investment.product_id))
+        for investment in db.get_user_investments(account_id)
+    ]
+
+
+def n_plus_one_cached(db: Database, account_id: str):
+    return [
+        (investment, db.get_financial_product(investment.product_id))
+        for investment in db.get_user_investments(account_id)
+    ]
+
+
+def joined(db: Database, account_id: str):
+    return db.get_user_investment_details(account_id)
+
+
+def timed(fn, db, account_id, repeat):
+    fn(db, account_id)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(db, account_id)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--investments", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.sqlite3"))
+        seed(db, "1005", args.investments)
+        print(f"{args.investments} investments on one account, mean of {args.repeat} runs")
+        for label, fn in [
+            ("N+1 (uncached)", n_plus_one_uncached),
+            ("N+1 (cached)", n_plus_one_cached),
+            ("joined", joined),
+        ]:
+            before = db.pool.stats()["checkouts"]
+            elapsed = timed(fn, db, "1005", args.repeat)
+            checkouts = (db.pool.stats()["checkouts"] - before) / (args.repeat + 1)
+            print(f"{label:<16} {elapsed * 1000:9.2f} ms/call  {checkouts:8.0f} connection checkouts/call")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: hospital_search_patients latency with 1M patients in the FTS5 indexes.
+
+Seeds a temporary hospital database with synthetic patients (inserted through
+the sync triggers, like registrations) and times search_patients for exact,
+prefix, misspelled, substring and phone-suffix queries. The exact
+LOWER(name) = LOWER(?) lookup that get_patient_by_name uses is timed for
+reference.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_patient_search [--patients 1000000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from db.hospital_db import HospitalDatabase
+
+FIRST_NAMES = (
+    "Alice Bob Carol David Emily Frank Grace Henry Irene Jack Karen Leo Mia Nina Oscar Paul Quinn Rose "
+    "Sam Tina Uma Victor Wendy Xavier Yuki Zoe Wei Fang Jing Lei Min Hui Xin Yan Jun Ming Hao Jie Ling "
+    "Mei Qiang Tao Yong Hong Ping Bin Chao Dan Xiaoming Xiaohong Zhiwei Jianguo Guilan Shufen"
+).split()
+SURNAMES = (
+    "Wong Zhang Liu Chen Wang Li Zhao Huang Zhou Wu Xu Sun Hu Zhu Gao Lin He Guo Ma Luo Liang Song Zheng "
+    "Xie Han Tang Feng Yu Dong Xiao Cheng Cao Yuan Deng Fu Shen Zeng Peng Lu Su Jiang Cai Jia Ding Wei "
+    "Xue Ye Yan Pan Du Dai Xia Zhong Tian Ren Fan Fang Shi Yao Tan Liao Zou Xiong Jin Hao Kong Bai Cui "
+    "Kang Mao Qiu Qin Gu Hou Shao Meng Long Wan Duan Lei Qian Yin Yi Chang Qiao Lai Gong Wen Smith Garcia"
+).split()
+
+QUERIES = [
+    ("exact full name", "Alice Wong"),
+    ("common surname", "Wang"),
+    ("name prefix", "xiaom zh"),
+    ("misspelled", "Alise Wnog"),
+    ("transposed", "Xiaomign Zhu"),
+    ("substring", "anguo"),
+    ("phone suffix", "0001"),
+    ("full phone", "138-0001-0001"),
+]
+
+
+def seed(database: HospitalDatabase, patients: int, batch: int = 50000):
+    rng = random.Random(7)
+    with database.get_connection() as conn:
+        for start in range(0, patients, batch):
+            conn.executemany(
+                "INSERT INTO patients (id, name, date_of_birth, gender, phone, id_number) VALUES (?,?,?,?,?,?)",
+                [
+                    (f"S{n:07d}", f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                     f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     rng.choice(("Male", "Female")),
+                     f"1{rng.randint(30, 89)}-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}",
+                     f"ID{n:012d}")
+                    for n in range(start, min(start + batch, patients))
+                ],
+            )
+        conn.commit()
+
+
+def timed(fn, repeat: int):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.95) - 1], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    database = HospitalDatabase(os.path.join(tempfile.mkdtemp(), "hospital.sqlite3"))
+    started = time.perf_counter()
+    seed(database, args.patients)
+    print(f"seeded {args.patients} patients in {time.perf_counter() - started:.1f} s")
+
+    print(f"{'query':<18} {'text':<16} {'mean ms':>8} {'p95 ms':>8}  top result")
+    for label, query in QUERIES:
+        mean, p95, results = timed(lambda: database.search_patients(query, args.limit), args.repeat)
+        top = f"{results[0][1]} ({results[0][-2]}, {len(results)} results)" if results else "-"
+        print(f"{label:<18} {query:<16} {mean:8.2f} {p95:8.2f}  {top}")
+    mean, p95, _ = timed(lambda: database.get_patient_by_name("Alice Wong"), args.repeat)
+    print(f"{'exact (indexed)':<18} {'Alice Wong':<16} {mean:8.2f} {p95:8.2f}  get_patient_by_name")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
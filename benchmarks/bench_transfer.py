@@ -0,0 +1,76 @@
+"""Throughput benchmark: atomic Database.transfer() vs. the legacy multi-call path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_transfer [--threads 8] [--transfers 200]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from db.database import Database
+
+
+def legacy_transfer(db: Database, from_account_id: str, to_account_id: str, amount: float):
+    """The pre-transfer() code path of the transfer_money tool"""
+    from_account = db.get_account(from_account_id)
+    to_account = db.get_account(to_account_id)
+    if not from_account or not to_account or amount <= 0 or from_account.balance < amount:
+        return None
+    db.update_balance(from_account_id, -amount)
+    db.update_balance(to_account_id, amount)
+    return db.add_transaction(from_account_id, to_account_id, amount, "bench")
+
+
+def atomic_transfer(db: Database, from_account_id: str, to_account_id: str, amount: float):
+    return db.transfer(from_account_id, to_account_id, amount, "bench")
+
+
+def run(label: str, fn, threads: int, transfers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.sqlite3"), pool_size=threads)
+        start_total = sum(a[2] for a in _balances(db))
+        pairs = [("1005", "1001"), ("1004", "1002"), ("1005", "1003"), ("1004", "1001")]
+
+        def worker(n: int):
+            src, dst = pairs[n % len(pairs)]
+            for _ in range(transfers):
+                fn(db, src, dst, 1.0)
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        total = threads * transfers
+        end_total = sum(a[2] for a in _balances(db))
+        stats = db.pool.stats()
+        db.close()
+    print(
+        f"{label:<8} {total:>6} transfers in {elapsed:7.3f}s  "
+        f"{total / elapsed:9.1f} tx/s  checkouts={stats['checkouts']:<7} "
+        f"waits={stats['waits']:<5} money conserved={abs(end_total - start_total) < 1e-6}"
+    )
+
+
+def _balances(db: Database):
+    with db.get_connection() as conn:
+        return conn.execute("SELECT id, name, balance FROM accounts").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transfers", type=int, default=200, help="transfers per thread")
+    args = parser.parse_args()
+
+    run("legacy", legacy_transfer, args.threads, args.transfers)
+    run("atomic", atomic_transfer, args.threads, args.transfers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Load test: banking tail latency while the hospital database is saturated.
+
+A background thread repeatedly holds an exclusive lock on the hospital
+database while many concurrent tasks try to register patients. A probe task
+measures get_account latency on the banking database in the same event loop.
+The "blocking" mode calls the synchronous database inline (as the tools did
+before AsyncDatabase), the "async" mode goes through the per-database executors.
+
+Usage (from the repository root):
+    python -m benchmarks.load_async_isolation [--seconds 3] [--writers 32]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from db.async_db import AsyncDatabase, AsyncHospitalDatabase
+from db.database import Database
+from db.hospital_db import HospitalDatabase
+
+
+def hold_locks(db_path: str, stop: threading.Event, hold: float):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    while not stop.is_set():
+        conn.execute("BEGIN EXCLUSIVE")
+        time.sleep(hold)
+        conn.execute("COMMIT")
+        time.sleep(0.01)
+    conn.close()
+
+
+async def scenario(mode: str, bank: Database, hospital: HospitalDatabase, seconds: float,
+                   writers: int, saturate: bool):
+    async_bank = AsyncDatabase(bank)
+    async_hospital = AsyncHospitalDatabase(hospital)
+    deadline = time.monotonic() + seconds
+    latencies = []
+    hospital_ops = 0
+
+    async def probe():
+        # Latency includes the time the probe waited for the event loop to wake it up
+        interval = 0.005
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            if mode == "blocking":
+                bank.get_account("1001")
+            else:
+                await async_bank.get_account("1001")
+            latencies.append(time.perf_counter() - started - interval)
+
+    async def writer(n: int):
+        nonlocal hospital_ops
+        i = 0
+        while time.monotonic() < deadline:
+            args = (f"Load {n}-{i}", "1990-01-01", "Male", "130-0000-0000", f"ID{n}-{i}")
+            if mode == "blocking":
+                hospital.create_patient(*args)
+                await asyncio.sleep(0)
+            else:
+                await async_hospital.create_patient(*args)
+            hospital_ops += 1
+            i += 1
+
+    tasks = [probe()]
+    if saturate:
+        tasks += [writer(n) for n in range(writers)]
+    await asyncio.gather(*tasks)
+    async_bank.shutdown()
+    async_hospital.shutdown()
+    return latencies, hospital_ops
+
+
+def report(label: str, latencies, hospital_ops: int):
+    ms = sorted(x * 1000 for x in latencies)
+    q = statistics.quantiles(ms, n=100)
+    print(
+        f"{label:<22} probes={len(ms):<6} p50={q[49]:8.2f}ms p95={q[94]:8.2f}ms "
+        f"p99={q[98]:8.2f}ms max={ms[-1]:8.2f}ms hospital_writes={hospital_ops}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--hold", type=float, default=0.2, help="seconds each exclusive lock is held")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = Database(os.path.join(tmp, "bank.sqlite3"))
+        hospital_path = os.path.join(tmp, "hospital.sqlite3")
+        hospital = HospitalDatabase(hospital_path)
+
+        for mode in ("blocking", "async"):
+            latencies, ops = asyncio.run(
+                scenario(mode, bank, hospital, args.seconds, args.writers, saturate=False)
+            )
+            report(f"{mode} / idle", latencies, ops)
+
+            stop = threading.Event()
+            locker = threading.Thread(target=hold_locks, args=(hospital_path, stop, args.hold))
+            locker.start()
+            try:
+                latencies, ops = asyncio.run(
+                    scenario(mode, bank, hospital, args.seconds, args.writers, saturate=True)
+                )
+            finally:
+                stop.set()
+                locker.join()
+            report(f"{mode} / saturated", latencies, ops)
+
+        bank.close()
+        hospital.close()
+
+
+if __name__ == "__main__":
+    main()
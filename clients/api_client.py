@@ -1,59 +1,216 @@
+import asyncio
 import httpx
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Any, Optional
+from clients.resilience import ResilientCaller
+from clients.response_cache import CachedResponse, ResponseCache, parse_cache_control
+from clients.streaming import STREAM_PARSERS, StreamAssembler
+from schemas.models import APIConfig, RequestPlan
 from utils.config_loader import config_loader
 
+try:
+    import h2  # noqa: F401  (optional, enables HTTP/2)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 
 class APIClient:
     """API Client Class"""
-    
+
     def __init__(self):
         self.config_loader = config_loader
-        self.client = httpx.AsyncClient()
-    
+        self._plans: Optional[Dict[str, RequestPlan]] = None
+        # One pooled client and concurrency limit per configured API
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Retry / hedging / circuit breaker state per API, kept across client restarts
+        self._resilience: Dict[str, ResilientCaller] = {}
+        # Responses of GET endpoints that declare cache_ttl
+        self.response_cache = ResponseCache()
+
+    @property
+    def plans(self) -> Dict[str, RequestPlan]:
+        """Request plans keyed by tool name, compiled once from the configuration"""
+        if self._plans is None:
+            self._plans = self.config_loader.build_request_plans()
+        return self._plans
+
+    def get_plan(self, tool_name: str) -> RequestPlan:
+        plan = self.plans.get(tool_name)
+        if plan is None:
+            raise ValueError(f"No endpoint found for tool name: {tool_name}")
+        return plan
+
+    def _create_client(self, api_config: APIConfig) -> httpx.AsyncClient:
+        http = api_config.http
+        http2 = http.http2 and _HTTP2_AVAILABLE
+        if http.http2 and not _HTTP2_AVAILABLE:
+            print(f"[APIClient] {api_config.name}: http2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=http.max_connections,
+                max_keepalive_connections=http.max_keepalive_connections,
+                keepalive_expiry=http.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=http.connect_timeout,
+                read=http.read_timeout,
+                write=http.write_timeout,
+                pool=http.pool_timeout,
+            ),
+        )
+
+    def get_client(self, api_name: str) -> httpx.AsyncClient:
+        """Pooled HTTP client for one API, created on first use"""
+        client = self._clients.get(api_name)
+        if client is None:
+            api_config = self.config_loader.get_api_config(api_name)
+            client = self._clients[api_name] = self._create_client(api_config)
+            limit = api_config.http.max_concurrency or api_config.http.max_connections
+            self._semaphores[api_name] = asyncio.Semaphore(limit)
+            if api_name not in self._resilience:
+                self._resilience[api_name] = ResilientCaller(api_name, api_config.resilience)
+        return client
+
     async def make_request(self, tool_name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make API request based on tool name"""
         try:
-            # Get endpoint configuration
-            endpoint_config = self.config_loader.get_endpoint_by_tool_name(tool_name)
-            api_config = endpoint_config["api_config"]
-            endpoint = endpoint_config["endpoint"]
-            
-            # Build request URL
-            url = f"{api_config['base_url']}{endpoint['path']}"
-            
-            # Merge headers
-            headers = {}
-            if api_config.get('headers'):
-                headers.update(api_config['headers'])
-            if endpoint.get('headers'):
-                headers.update(endpoint['headers'])
-            
-            # Process parameters
-            request_params = params or {}
-            
-            # Make request based on HTTP method
-            method = endpoint['method'].upper()
-            
-            if method == 'GET':
-                response = await self.client.get(url, params=request_params, headers=headers)
-            elif method == 'POST':
-                response = await self.client.post(url, json=request_params, headers=headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            
-            # Return formatted response based on tool name
-            return response.json()
-            
+            plan = self.get_plan(tool_name)
+            request_params = {**plan.static_params, **params} if params else plan.static_params
+
+            if plan.cache_ttl is None:
+                response = await self._send(plan, request_params)
+                response.raise_for_status()
+                return response.json()
+            return await self._cached_request(plan, request_params)
+
         except httpx.HTTPError as e:
             raise Exception(f"API请求失败: {str(e)}")
         except ValueError as e:
             raise Exception(f"配置错误: {str(e)}")
-    
+
+    async def stream_request(self, tool_name: str, params: Optional[Dict[str, Any]] = None,
+                             on_chunk: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Make a streaming API request, calling ``on_chunk(text, event)`` as events arrive.
+
+        The body is parsed incrementally (SSE or NDJSON, per the endpoint's
+        stream_format) and only the assembled result is kept.
+        """
+        try:
+            plan = self.get_plan(tool_name)
+            client = self.get_client(plan.api_name)
+            request_params = {**plan.static_params, **params} if params else plan.static_params
+            parse = STREAM_PARSERS[plan.stream_format or "sse"]
+            assembler = StreamAssembler()
+
+            if plan.method == 'GET':
+                request = client.build_request("GET", plan.url, params=request_params, headers=plan.headers)
+            else:
+                request = client.build_request("POST", plan.url, json=request_params, headers=plan.headers)
+
+            async def open_stream():
+                return await client.send(request, stream=True)
+
+            async with self._semaphores[plan.api_name]:
+                # Only the opening of the stream is retried; chunks already forwarded cannot be replayed
+                response = await self._resilience[plan.api_name].call(
+                    plan.method, open_stream, hedge=False, on_discard=lambda discarded: discarded.aclose()
+                )
+                try:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for event in parse(response.aiter_lines()):
+                        chunk = assembler.add(event)
+                        if on_chunk is not None:
+                            await on_chunk(chunk, event)
+                finally:
+                    await response.aclose()
+
+            return assembler.result()
+
+        except httpx.HTTPError as e:
+            raise Exception(f"API请求失败: {str(e)}")
+        except (ValueError, KeyError) as e:
+            raise Exception(f"配置错误: {str(e)}")
+
+    async def _send(self, plan: RequestPlan, request_params: Dict[str, Any],
+                    extra_headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        client = self.get_client(plan.api_name)
+        headers = {**plan.headers, **extra_headers} if extra_headers else plan.headers
+        semaphore = self._semaphores[plan.api_name]
+
+        async def send() -> httpx.Response:
+            async with semaphore:
+                if plan.method == 'GET':
+                    return await client.get(plan.url, params=request_params, headers=headers)
+                return await client.post(plan.url, json=request_params, headers=headers)
+
+        return await self._resilience[plan.api_name].call(plan.method, send)
+
+    async def _cached_request(self, plan: RequestPlan, request_params: Dict[str, Any]) -> Any:
+        cache = self.response_cache
+        key = cache.make_key(plan.tool_name, request_params)
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh():
+            cache.hits += 1
+            return entry.data
+        cache.misses += 1
+        return await cache.coalesce(key, lambda: self._fetch_and_cache(plan, request_params, key, entry))
+
+    async def _fetch_and_cache(self, plan: RequestPlan, request_params: Dict[str, Any], key,
+                               stale: Optional[CachedResponse]) -> Any:
+        response = await self._send(plan, request_params, stale.conditional_headers() if stale else None)
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        ttl = plan.cache_ttl
+        if "max-age" in directives:
+            try:
+                ttl = float(directives["max-age"])
+            except (TypeError, ValueError):
+                pass
+        if "no-cache" in directives:
+            ttl = 0.0  # usable only after revalidation
+
+        if response.status_code == 304 and stale is not None:
+            self.response_cache.revalidated += 1
+            stale.refresh(ttl)
+            return stale.data
+
+        response.raise_for_status()
+        data = response.json()
+        if "no-store" in directives or "private" in directives:
+            self.response_cache.discard(key)
+        else:
+            self.response_cache.store(key, CachedResponse(
+                data, ttl,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            ))
+        return data
+
+    def metrics(self) -> Dict[str, Any]:
+        """Circuit breaker state and request counters per API, plus response cache stats"""
+        return {
+            "apis": {name: caller.metrics() for name, caller in self._resilience.items()},
+            "response_cache": self.response_cache.stats(),
+        }
+
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Close every pooled HTTP client"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._semaphores.clear()
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    @asynccontextmanager
+    async def lifespan(self):
+        """Wrap a server's run so the connection pools are drained on shutdown"""
+        try:
+            yield self
+        finally:
+            await self.close()
 
 
 # Singleton API client instance
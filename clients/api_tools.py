@@ -0,0 +1,90 @@
+import inspect
+from typing import Annotated, Any, Dict, List
+
+from fastmcp import Context, FastMCP
+from pydantic import Field
+
+from clients.api_client import APIClient, api_client
+from schemas.models import APIParameter, RequestPlan
+
+# APIParameter.type -> Python annotation used in the generated tool signature
+_PARAMETER_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "object": Dict[str, Any],
+    "array": List[Any],
+}
+
+
+def _parse_default(parameter: APIParameter, annotation):
+    if parameter.default is None:
+        return None
+    if annotation is bool:
+        return parameter.default.strip().lower() in ("true", "1", "yes")
+    if annotation in (int, float, str):
+        return annotation(parameter.default)
+    return parameter.default
+
+
+def build_signature(plan: RequestPlan) -> inspect.Signature:
+    """Typed keyword-only signature generated from the endpoint's APIParameter list"""
+    parameters = []
+    if plan.stream_format:
+        # Injected by FastMCP, not part of the tool's input schema
+        parameters.append(inspect.Parameter("ctx", inspect.Parameter.KEYWORD_ONLY, annotation=Context))
+    for parameter in plan.parameters:
+        annotation = _PARAMETER_TYPES.get(parameter.type.lower(), str)
+        default = inspect.Parameter.empty if parameter.required else _parse_default(parameter, annotation)
+        parameters.append(inspect.Parameter(
+            parameter.name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=default,
+            annotation=Annotated[annotation, Field(description=parameter.description)],
+        ))
+    return inspect.Signature(parameters)
+
+
+def build_api_tool(plan: RequestPlan, client: APIClient = api_client):
+    """Create the async tool function that forwards its arguments through ``plan``"""
+
+    async def call_api(**kwargs):
+        ctx = kwargs.pop("ctx", None)
+        params = {name: value for name, value in kwargs.items() if value is not None}
+        try:
+            if not plan.stream_format:
+                return await client.make_request(plan.tool_name, params)
+
+            received = 0
+
+            async def forward(chunk, event):
+                # Stream text chunks to the MCP client as progress notifications
+                nonlocal received
+                if chunk and ctx is not None:
+                    received += 1
+                    await ctx.report_progress(progress=received, message=chunk)
+
+            return await client.stream_request(plan.tool_name, params, on_chunk=forward)
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"{plan.tool_name} failed: {str(e)}"
+            }
+
+    signature = build_signature(plan)
+    call_api.__name__ = plan.tool_name
+    call_api.__qualname__ = plan.tool_name
+    call_api.__doc__ = plan.description
+    call_api.__signature__ = signature
+    call_api.__annotations__ = {p.name: p.annotation for p in signature.parameters.values()}
+    return call_api
+
+
+def register_api_tools(server: FastMCP, client: APIClient = api_client) -> List[str]:
+    """Register every endpoint in api_config.yaml as a tool on ``server``"""
+    registered = []
+    for tool_name, plan in client.plans.items():
+        server.tool(build_api_tool(plan, client), name=tool_name, description=plan.description)
+        registered.append(tool_name)
+    return registered
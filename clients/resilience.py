@@ -0,0 +1,234 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+import httpx
+
+from schemas.models import CircuitBreakerPolicy, ResiliencePolicy
+
+
+class CircuitOpenError(Exception):
+    """Raised without contacting the upstream while its circuit breaker is open"""
+
+    def __init__(self, api_name: str, retry_in: float):
+        self.api_name = api_name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {api_name}: upstream is failing, retry in {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    closed: calls pass; ``failure_threshold`` consecutive failures open the circuit.
+    open: calls fail fast with CircuitOpenError until ``reset_timeout`` elapses.
+    half_open: up to ``half_open_max_calls`` probes pass; a success closes the
+    circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, api_name: str, policy: CircuitBreakerPolicy):
+        self.api_name = api_name
+        self.policy = policy
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; admitted calls must report back"""
+        if not self.policy.enabled:
+            return
+        if self.state == self.OPEN:
+            retry_in = self.opened_at + self.policy.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.api_name, retry_in)
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+        if self.state == self.HALF_OPEN:
+            if self.probes_in_flight >= self.policy.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.api_name, 0.0)
+            self.probes_in_flight += 1
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.probes_in_flight = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.consecutive_failures >= self.policy.failure_threshold):
+            self._open()
+
+    def release(self):
+        """Admitted call ended without a verdict (e.g. cancelled)"""
+        if self.state == self.HALF_OPEN and self.probes_in_flight:
+            self.probes_in_flight -= 1
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+
+class LatencyTracker:
+    """Sliding window of recent successful request latencies (seconds)"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ResilientCaller:
+    """Applies one API's ResiliencePolicy (deadline, retries, hedging, circuit breaker) to its requests"""
+
+    def __init__(self, api_name: str, policy: ResiliencePolicy):
+        self.api_name = api_name
+        self.policy = policy
+        self.breaker = CircuitBreaker(api_name, policy.circuit_breaker)
+        self.latency = LatencyTracker(policy.hedge.window)
+        self._idempotent = {method.upper() for method in policy.retry.methods}
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def call(self, method: str, send: Callable[[], Awaitable[httpx.Response]],
+                   hedge: bool = True,
+                   on_discard: Optional[Callable[[httpx.Response], Awaitable[None]]] = None) -> httpx.Response:
+        """Send via ``send()`` under the policy.
+
+        Transport errors and ``retry_on_status`` responses are retried with full
+        jitter backoff, only for idempotent methods and within the deadline. The
+        last response is returned as-is once retries are exhausted so callers
+        keep their own ``raise_for_status`` handling. Responses dropped for a
+        retry are passed to ``on_discard`` first, e.g. to close an open stream.
+        """
+        retry = self.policy.retry
+        idempotent = method.upper() in self._idempotent
+        max_attempts = retry.max_attempts if idempotent else 1
+        deadline = time.monotonic() + self.policy.deadline if self.policy.deadline else None
+        self.calls += 1
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            response, error = None, None
+            try:
+                response = await self._attempt(send, hedge and idempotent, deadline)
+            except httpx.TransportError as e:
+                error = e
+                self.breaker.record_failure()
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in retry.retry_on_status:
+                    self.successes += response.status_code < 400
+                    self.failures += response.status_code >= 400
+                    return response
+
+            delay = random.uniform(0, min(retry.backoff_max, retry.backoff_base * 2 ** (attempt - 1)))
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if attempt >= max_attempts or out_of_time or self.breaker.state == CircuitBreaker.OPEN:
+                self.failures += 1
+                if response is not None:
+                    return response
+                raise error
+            self.retries += 1
+            if response is not None and on_discard is not None:
+                await on_discard(response)
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, send, hedge: bool, deadline: Optional[float]) -> httpx.Response:
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise httpx.TimeoutException(f"Deadline of {self.policy.deadline}s exceeded for {self.api_name}")
+        try:
+            return await asyncio.wait_for(self._send_hedged(send) if hedge else self._timed(send), timeout)
+        except asyncio.TimeoutError:
+            raise httpx.TimeoutException(f"Deadline of {self.policy.deadline}s exceeded for {self.api_name}")
+
+    async def _timed(self, send) -> httpx.Response:
+        started = time.monotonic()
+        response = await send()
+        if response.status_code < 500:
+            self.latency.record(time.monotonic() - started)
+        return response
+
+    async def _send_hedged(self, send) -> httpx.Response:
+        """Race a second request once the first outlives the configured latency percentile"""
+        policy = self.policy.hedge
+        delay = None
+        if policy.enabled and len(self.latency.samples) >= policy.min_samples:
+            delay = self.latency.percentile(policy.percentile)
+        if delay is None:
+            return await self._timed(send)
+
+        primary = asyncio.ensure_future(self._timed(send))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            self.hedged += 1
+            pending.add(asyncio.ensure_future(self._timed(send)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        p50 = self.latency.percentile(50)
+        p95 = self.latency.percentile(95)
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened,
+            "rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
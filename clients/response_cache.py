@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CachedResponse:
+    """A cached upstream response body plus its HTTP validators"""
+
+    __slots__ = ("data", "expires_at", "etag", "last_modified")
+
+    def __init__(self, data: Any, ttl: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.data = data
+        self.expires_at = time.monotonic() + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def refresh(self, ttl: float):
+        self.expires_at = time.monotonic() + ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def parse_cache_control(header: Optional[str]) -> Dict[str, Optional[str]]:
+    """``"max-age=60, no-cache"`` -> ``{"max-age": "60", "no-cache": None}``"""
+    directives = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+class _Flight:
+    """An in-flight fetch and the number of callers still waiting for it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of upstream responses with single-flight request coalescing.
+
+    Concurrent callers asking for the same key while a fetch is in flight all
+    await that one fetch instead of issuing their own upstream request.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(tool_name: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return tool_name, json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Entry for ``key`` (fresh or stale, so it can be revalidated), or None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Hashable, entry: CachedResponse):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    async def coalesce(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once per key at a time; concurrent callers share its result.
+
+        The fetch runs in its own task, so cancelling one caller (e.g. a client
+        disconnecting) does not fail the others; the task is only cancelled
+        once every caller waiting on it has gone away.
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fetch()))
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            # Only reached with the task pending when this caller was cancelled
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _finish(self, key: Hashable, flight: "_Flight"):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark retrieved so an exception nobody else awaited is not logged
+            flight.task.exception()
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,87 @@
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Event fields that carry incremental text, in order of preference
+_TEXT_FIELDS = ("answer", "delta", "text", "content")
+
+
+async def iter_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Parse a ``text/event-stream`` body incrementally into JSON events"""
+    data_lines = []
+    event_type = None
+    async for line in lines:
+        if not line:
+            if data_lines:
+                yield _decode_event("\n".join(data_lines), event_type)
+            data_lines, event_type = [], None
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive ping
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            data_lines.append(value)
+        elif field == "event":
+            event_type = value
+    if data_lines:
+        yield _decode_event("\n".join(data_lines), event_type)
+
+
+async def iter_ndjson_events(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Parse newline-delimited JSON incrementally"""
+    async for line in lines:
+        line = line.strip()
+        if line:
+            yield _decode_event(line, None)
+
+
+def _decode_event(payload: str, event_type: Optional[str]) -> Dict[str, Any]:
+    try:
+        event = json.loads(payload)
+    except json.JSONDecodeError:
+        event = {"text": payload}
+    if not isinstance(event, dict):
+        event = {"data": event}
+    if event_type and "event" not in event:
+        event["event"] = event_type
+    return event
+
+
+STREAM_PARSERS = {
+    "sse": iter_sse_events,
+    "ndjson": iter_ndjson_events,
+}
+
+
+class StreamAssembler:
+    """Builds the final result from streamed events without keeping the raw body.
+
+    Text chunks are concatenated; every other top-level field keeps its latest
+    value (ids, usage metadata, ...).
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.fields: Dict[str, Any] = {}
+        self.events = 0
+        self.text_field = "answer"
+
+    def add(self, event: Dict[str, Any]) -> Optional[str]:
+        """Record one event; returns its text chunk, if any"""
+        self.events += 1
+        if event.get("event") == "error":
+            raise Exception(f"Upstream stream error: {event.get('message') or event}")
+        chunk = None
+        for name in _TEXT_FIELDS:
+            value = event.get(name)
+            if isinstance(value, str):
+                chunk, self.text_field = value, name
+                self.chunks.append(value)
+                break
+        for name, value in event.items():
+            if name != self.text_field:
+                self.fields[name] = value
+        return chunk
+
+    def result(self) -> Dict[str, Any]:
+        return {**self.fields, self.text_field: "".join(self.chunks), "stream_events": self.events}
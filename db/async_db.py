@@ -0,0 +1,61 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from db.database import Database, db
+from db.hospital_db import HospitalDatabase, hospital_db
+
+
+class AsyncExecutorDatabase:
+    """Async facade that runs a synchronous database's methods on a dedicated thread pool.
+
+    Every database gets its own bounded executor, sized to its connection pool,
+    so a slow query or a locked file on one server only queues work behind that
+    server's executor and never blocks the shared event loop.
+
+        account = await async_db.get_account("1001")
+    """
+
+    def __init__(self, database, max_workers: int = None, thread_name_prefix: str = "db"):
+        self.database = database
+        self.max_workers = max_workers or database.pool.max_connections
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=thread_name_prefix
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on this database's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name):
+        attr = getattr(self.database, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return call
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncDatabase(AsyncExecutorDatabase):
+    """Async access to the banking ``Database``"""
+
+    def __init__(self, database: Database, max_workers: int = None):
+        super().__init__(database, max_workers, thread_name_prefix="bank-db")
+
+
+class AsyncHospitalDatabase(AsyncExecutorDatabase):
+    """Async access to ``HospitalDatabase``"""
+
+    def __init__(self, database: HospitalDatabase, max_workers: int = None):
+        super().__init__(database, max_workers, thread_name_prefix="hospital-db")
+
+
+async_db = AsyncDatabase(db)
+async_hospital_db = AsyncHospitalDatabase(hospital_db)
@@ -1,17 +1,69 @@
+import base64
+import json
+import math
 import sqlite3
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import uuid
 from datetime import datetime, timedelta
-from schemas.bank_models import Account, Transaction
-from schemas.financial_models import FinancialProduct, UserInvestment
+from schemas.bank_models import Account, Transaction, TransferReceipt, TransferRequest, BatchTransferResult
+from schemas.financial_models import FinancialProduct, UserInvestment, InvestmentDetail
+from db.pool import ConnectionPool
+from utils.cache import TTLCache
+
+
+class TransferError(Exception):
+    """转账被拒绝（账户不存在、金额无效或余额不足）"""
+
+
+def encode_transaction_cursor(timestamp: str, transaction_id: str) -> str:
+    """把 (timestamp, id) 编码为不透明的翻页游标"""
+    key = json.dumps([timestamp, transaction_id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_transaction_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, transaction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(timestamp), str(transaction_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class Database:
-    def __init__(self, db_path="db/db.sqlite3"):
+    # 版本化迁移：PRAGMA user_version 记录当前库已执行到第几个版本，init_database 时补齐
+    MIGRATIONS = [
+        # v1: 热点查询的二级索引
+        (
+            "CREATE INDEX IF NOT EXISTS idx_accounts_name ON accounts (name)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_from_account ON transactions (from_account, timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_to_account ON transactions (to_account, timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_financial_products_status ON financial_products (status)",
+            "CREATE INDEX IF NOT EXISTS idx_user_investments_account ON user_investments (account_id, investment_date)",
+        ),
+        # v2: 交易索引加入 id，支持 (timestamp, id) 游标分页
+        (
+            "DROP INDEX IF EXISTS idx_transactions_from_account",
+            "DROP INDEX IF EXISTS idx_transactions_to_account",
+            "CREATE INDEX idx_transactions_from_account ON transactions (from_account, timestamp, id)",
+            "CREATE INDEX idx_transactions_to_account ON transactions (to_account, timestamp, id)",
+        ),
+    ]
+    
+    def __init__(self, db_path="db/db.sqlite3", pool_size: int = 8, cache_ttl: float = 300.0):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_connections=pool_size)
+        # 理财产品等参考数据的进程内缓存，写路径通过 invalidate_product_cache() 失效
+        self.reference_cache = TTLCache(maxsize=256, ttl=cache_ttl)
         self.init_database()
     
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Check out a pooled connection; use as ``with db.get_connection() as conn``"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
     
     def init_database(self):
         print("初始化数据库...")
@@ -65,10 +117,21 @@ class Database:
                     FOREIGN KEY (product_id) REFERENCES financial_products (id)
                 )
             """)
+            self._migrate(conn)
             # 插入示例数据（如果表为空）
             if conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0] == 0:
                 self._insert_sample_data(conn)
             conn.commit()
+        self.invalidate_product_cache()
+    
+    def _migrate(self, conn):
+        """执行尚未应用的迁移版本"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(self.MIGRATIONS) + 1):
+            print(f"执行数据库迁移 v{target}...")
+            for statement in self.MIGRATIONS[target - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
     
     def _insert_sample_data(self, conn):
         # 插入示例账户
@@ -118,6 +181,11 @@ class Database:
                 return Account(id=row[0], name=row[1], balance=row[2], card_number=row[3])
             return None
         
+    def list_accounts(self) -> List[tuple]:
+        """列出所有账户的 (id, name, balance)"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT id, name, balance FROM accounts ORDER BY id").fetchall()
+    
     def get_account_by_name(self, name: str) -> Optional[Account]:
         with self.get_connection() as conn:
             cursor = conn.execute(
@@ -165,34 +233,236 @@ class Database:
                 description=description
             )
     
-    def get_account_transactions(self, account_id: str, limit: int = 10) -> List[Transaction]:
+    @staticmethod
+    def _begin_write(conn: sqlite3.Connection, savepoint: str) -> bool:
+        """开启写事务，返回本次调用是否拥有该事务
+        
+        调用方已处于事务中时只建立 SAVEPOINT，外层事务的提交与回滚仍由调用方决定。
+        """
+        if conn.in_transaction:
+            conn.execute(f"SAVEPOINT {savepoint}")
+            return False
+        conn.execute("BEGIN IMMEDIATE")
+        return True
+    
+    @staticmethod
+    def _end_write(conn: sqlite3.Connection, savepoint: str, owns_tx: bool, commit: bool = True):
+        """结束 _begin_write 开启的事务：自有事务提交或回滚，嵌套时释放或回退 SAVEPOINT"""
+        if owns_tx:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+            return
+        if not commit:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+        conn.execute(f"RELEASE {savepoint}")
+    
+    def transfer(self, from_account: str, to_account: str, amount: float, description: str = None) -> TransferReceipt:
+        """原子转账：余额校验、双边记账和交易记录写入在同一个 BEGIN IMMEDIATE 事务中完成"""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT id, from_account, to_account, amount, timestamp, description 
-                FROM transactions 
-                WHERE from_account = ? OR to_account = ? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
+            owns_tx = self._begin_write(conn, "transfer")
+            try:
+                rows = {
+                    row[0]: row for row in conn.execute(
+                        "SELECT id, name, balance, card_number FROM accounts WHERE id IN (?, ?)",
+                        (from_account, to_account)
+                    )
+                }
+                if from_account not in rows:
+                    raise TransferError(f"Source account {from_account} does not exist")
+                if to_account not in rows:
+                    raise TransferError(f"Destination account {to_account} does not exist")
+                # NaN 与任何数比较都为假，需单独拒绝
+                if not math.isfinite(amount) or amount <= 0:
+                    raise TransferError("Transfer amount must be a finite number greater than 0")
+                
+                # 条件扣款：余额不足时不更新任何行
+                cursor = conn.execute(
+                    "UPDATE accounts SET balance = balance - ? WHERE id = ? AND balance >= ?",
+                    (amount, from_account, amount)
+                )
+                if cursor.rowcount == 0:
+                    raise TransferError(f"Insufficient balance. Current balance: {rows[from_account][2]}")
+                conn.execute(
+                    "UPDATE accounts SET balance = balance + ? WHERE id = ?",
+                    (amount, to_account)
+                )
+                
+                transaction_id = str(uuid.uuid4())
+                timestamp = datetime.now().isoformat()
+                conn.execute(
+                    "INSERT INTO transactions (id, from_account, to_account, amount, timestamp, description) VALUES (?, ?, ?, ?, ?, ?)",
+                    (transaction_id, from_account, to_account, amount, timestamp, description)
+                )
+            except BaseException:
+                self._end_write(conn, "transfer", owns_tx, commit=False)
+                raise
+            self._end_write(conn, "transfer", owns_tx)
+        
+        src, dst = rows[from_account], rows[to_account]
+        src_balance = src[2] - amount
+        dst_balance = dst[2] + amount
+        if from_account == to_account:
+            src_balance = dst_balance = src[2]
+        return TransferReceipt(
+            transaction=Transaction(
+                id=transaction_id,
+                from_account=from_account,
+                to_account=to_account,
+                amount=amount,
+                timestamp=datetime.fromisoformat(timestamp),
+                description=description
+            ),
+            from_account=Account(id=src[0], name=src[1], balance=src_balance, card_number=src[3]),
+            to_account=Account(id=dst[0], name=dst[1], balance=dst_balance, card_number=dst[3])
+        )
+    
+    def batch_transfer(self, transfers: List[TransferRequest], all_or_nothing: bool = True) -> List[BatchTransferResult]:
+        """批量转账：一次查询校验所有账户，executemany 写入，整批只提交一次
+        
+        all_or_nothing=True 时任意一笔失败则整批回滚；否则跳过失败项，其余照常入账。
+        转账按列表顺序依次校验，前面的转账会影响后面转账可用的余额。
+        """
+        results: List[BatchTransferResult] = []
+        if not transfers:
+            return results
+        
+        with self.get_connection() as conn:
+            owns_tx = self._begin_write(conn, "batch")
+            try:
+                account_ids = sorted({t.from_account_id for t in transfers} | {t.to_account_id for t in transfers})
+                balances = dict(conn.execute(
+                    "SELECT id, balance FROM accounts WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(account_ids),)
+                ).fetchall())
+                
+                deltas = {}
+                ledger_rows = []
+                for index, t in enumerate(transfers):
+                    error = None
+                    if t.from_account_id not in balances:
+                        error = f"Source account {t.from_account_id} does not exist"
+                    elif t.to_account_id not in balances:
+                        error = f"Destination account {t.to_account_id} does not exist"
+                    elif not math.isfinite(t.amount) or t.amount <= 0:
+                        error = "Transfer amount must be a finite number greater than 0"
+                    elif balances[t.from_account_id] < t.amount:
+                        error = f"Insufficient balance. Current balance: {balances[t.from_account_id]}"
+                
+                    result = BatchTransferResult(
+                        index=index,
+                        from_account=t.from_account_id,
+                        to_account=t.to_account_id,
+                        amount=t.amount,
+                        status="failed" if error else "success",
+                        error=error
+                    )
+                    if not error:
+                        balances[t.from_account_id] -= t.amount
+                        balances[t.to_account_id] += t.amount
+                        deltas[t.from_account_id] = deltas.get(t.from_account_id, 0.0) - t.amount
+                        deltas[t.to_account_id] = deltas.get(t.to_account_id, 0.0) + t.amount
+                        result.transaction_id = str(uuid.uuid4())
+                        ledger_rows.append((
+                            result.transaction_id, t.from_account_id, t.to_account_id,
+                            t.amount, datetime.now().isoformat(), t.description
+                        ))
+                    results.append(result)
+                
+                if all_or_nothing and len(ledger_rows) < len(transfers):
+                    self._end_write(conn, "batch", owns_tx, commit=False)
+                    for result in results:
+                        if result.status == "success":
+                            result.status = "rolled_back"
+                            result.transaction_id = None
+                    return results
+                
+                conn.executemany(
+                    "UPDATE accounts SET balance = balance + ? WHERE id = ?",
+                    [(delta, account_id) for account_id, delta in deltas.items() if delta]
+                )
+                conn.executemany(
+                    "INSERT INTO transactions (id, from_account, to_account, amount, timestamp, description) VALUES (?, ?, ?, ?, ?, ?)",
+                    ledger_rows
+                )
+            except BaseException:
+                self._end_write(conn, "batch", owns_tx, commit=False)
+                raise
+            self._end_write(conn, "batch", owns_tx)
+        
+        return results
+    
+    def get_account_transactions(self, account_id: str, limit: Optional[int] = 10,
+                                 before: Optional[Tuple[str, str]] = None) -> List[Transaction]:
+        """按 (timestamp, id) 倒序返回账户交易
+        
+        转出、转入两路分别走各自的 (account, timestamp, id) 索引，再由 UNION ALL 归并排序，
+        before 为上一页最后一条记录的 (timestamp, id)，任意深度的翻页代价相同。
+        """
+        return [self._row_to_transaction(row) for row in self._fetch_transaction_rows(account_id, before, limit)]
+    
+    def _fetch_transaction_rows(self, account_id: str, before: Optional[Tuple[str, str]], limit: Optional[int]):
+        keyset = ""
+        params = {"account_id": account_id, "limit": -1 if limit is None else limit}
+        if before is not None:
+            keyset = "AND (timestamp, id) < (:ts, :id)"
+            params["ts"], params["id"] = before
+        
+        # 在 with 块内取完所有行，连接立即归还连接池，不会在调用方迭代期间占着游标和读事务
+        with self.get_connection() as conn:
+            return conn.execute(
+                f"""
+                SELECT id, from_account, to_account, amount, timestamp, description
+                FROM transactions
+                WHERE from_account = :account_id {keyset}
+                UNION ALL
+                SELECT id, from_account, to_account, amount, timestamp, description
+                FROM transactions
+                WHERE to_account = :account_id AND from_account != :account_id {keyset}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT :limit
                 """,
-                (account_id, account_id, limit)
-            )
-            
-            transactions = []
-            for row in cursor.fetchall():
-                transactions.append(Transaction(
-                    id=row[0],
-                    from_account=row[1],
-                    to_account=row[2],
-                    amount=row[3],
-                    timestamp=datetime.fromisoformat(row[4]),
-                    description=row[5]
-                ))
-            
-            return transactions
+                params
+            ).fetchall()
+    
+    @staticmethod
+    def _row_to_transaction(row) -> Transaction:
+        return Transaction(
+            id=row[0],
+            from_account=row[1],
+            to_account=row[2],
+            amount=row[3],
+            timestamp=datetime.fromisoformat(row[4]),
+            description=row[5]
+        )
+    
+    def get_transaction_page(self, account_id: str, limit: int = 10,
+                             cursor: Optional[str] = None) -> Tuple[List[Transaction], Optional[str]]:
+        """获取一页交易记录，返回 (记录列表, 下一页游标)；没有更多记录时游标为 None"""
+        before = decode_transaction_cursor(cursor) if cursor else None
+        rows = self._fetch_transaction_rows(account_id, before, limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_transaction_cursor(rows[-1][4], rows[-1][0])
+        return [self._row_to_transaction(row) for row in rows], next_cursor
     
     def get_financial_products(self) -> List[FinancialProduct]:
-        """获取所有理财产品"""
+        """获取所有理财产品（读穿缓存）"""
+        return list(self.reference_cache.get_or_load(("financial_products",), self._load_financial_products))
+    
+    def get_financial_product(self, product_id: str) -> Optional[FinancialProduct]:
+        """获取特定理财产品（读穿缓存）"""
+        return self.reference_cache.get_or_load(
+            ("financial_product", product_id), lambda: self._load_financial_product(product_id)
+        )
+    
+    def invalidate_product_cache(self):
+        """理财产品表的任何写入之后调用，清空产品缓存"""
+        self.reference_cache.invalidate()
+    
+    def _load_financial_products(self) -> List[FinancialProduct]:
         with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT id, name, description, min_investment, expected_return_rate, risk_level, duration_days, status FROM financial_products WHERE status = 'available'"
@@ -213,8 +483,7 @@ class Database:
             
             return products
     
-    def get_financial_product(self, product_id: str) -> Optional[FinancialProduct]:
-        """获取特定理财产品"""
+    def _load_financial_product(self, product_id: str) -> Optional[FinancialProduct]:
         with self.get_connection() as conn:
             cursor = conn.execute(
                 "SELECT id, name, description, min_investment, expected_return_rate, risk_level, duration_days, status FROM financial_products WHERE id = ?",
@@ -310,6 +579,45 @@ class Database:
                 ))
             
             return investments
+    
+    def get_user_investment_details(self, account_id: str) -> List[InvestmentDetail]:
+        """获取用户投资记录及对应产品信息，一次 JOIN 查询完成"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT i.id, i.account_id, i.product_id, i.investment_amount, i.investment_date,
+                       i.expected_maturity_date, i.status,
+                       p.name, p.expected_return_rate, p.duration_days
+                FROM user_investments i
+                LEFT JOIN financial_products p ON p.id = i.product_id
+                WHERE i.account_id = ?
+                ORDER BY i.investment_date DESC
+                """,
+                (account_id,)
+            )
+            
+            details = []
+            for row in cursor:
+                rate, duration_days = row[8], row[9]
+                projected_payout = None
+                if rate is not None and duration_days is not None:
+                    # 年化收益率按持有天数折算
+                    projected_payout = round(row[3] * (1 + rate * duration_days / 365), 2)
+                details.append(InvestmentDetail(
+                    id=row[0],
+                    account_id=row[1],
+                    product_id=row[2],
+                    investment_amount=row[3],
+                    investment_date=datetime.fromisoformat(row[4]),
+                    expected_maturity_date=datetime.fromisoformat(row[5]),
+                    status=row[6],
+                    product_name=row[7] or row[2],
+                    expected_return_rate=rate,
+                    duration_days=duration_days,
+                    projected_payout=projected_payout
+                ))
+            
+            return details
 
 # 初始化数据库
 db = Database()
@@ -1,18 +1,369 @@
+import bisect
+import difflib
+import heapq
+import itertools
 import os
+import re
 import sqlite3
+import threading
+import time
 import uuid
 from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from db.pool import ConnectionPool
+from utils.cache import TTLCache
 
 _DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "hospital.sqlite3")
 
+class SlotTakenError(Exception):
+    """The doctor already has an active (not cancelled) appointment at that date and time"""
+
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+SLOT_MINUTES = 30
+
+
+def _to_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def canonical_time(hhmm: str) -> str:
+    """'9:00' -> '09:00'; raises ValueError for anything that is not a valid HH:MM time"""
+    return datetime.strptime(hhmm.strip(), "%H:%M").strftime("%H:%M")
+
+
+class DoctorSchedule(NamedTuple):
+    """A doctor's working pattern, parsed once from the available_days/available_times strings"""
+    doctor_id: str
+    name: str
+    specialty: str
+    fee: float
+    weekdays: frozenset                 # date.weekday() numbers
+    intervals: Tuple[Tuple[int, int], ...]  # (start, end) in minutes after midnight
+    grid: Tuple[int, ...]               # slot start minutes on a working day
+
+    @classmethod
+    def parse(cls, doctor_id: str, name: str, specialty: str, days: str, times: str, fee: float):
+        weekdays = frozenset(WEEKDAYS.index(d.strip()[:3].title()) for d in days.split(",") if d.strip())
+        intervals = tuple(sorted(
+            (_to_minutes(start), _to_minutes(end))
+            for start, _, end in (span.partition("-") for span in times.split(",") if span.strip())
+        ))
+        grid = tuple(
+            minute
+            for start, end in intervals
+            for minute in range(start, end - SLOT_MINUTES + 1, SLOT_MINUTES)
+        )
+        return cls(doctor_id, name, specialty, fee, weekdays, intervals, grid)
+
+    def free_slots(self, booked) -> List[int]:
+        """Grid slots not overlapped by a booking in sorted ``booked`` (bookings last SLOT_MINUTES and may be off-grid)"""
+        if not booked:
+            return list(self.grid)
+        free = []
+        for slot in self.grid:
+            i = bisect.bisect_right(booked, slot - SLOT_MINUTES)
+            if i == len(booked) or booked[i] >= slot + SLOT_MINUTES:
+                free.append(slot)
+        return free
+
+    def within_hours(self, day: date, minute: int) -> bool:
+        """True when ``minute`` is a slot start on the SLOT_MINUTES grid of a working day.
+
+        Off-grid starts are refused: a 09:15 booking would overlap the 09:00 and 09:30 slots
+        without colliding with either in idx_appointments_active_slot.
+        """
+        return day.weekday() in self.weekdays and minute in self.grid
+
+
+class SlotEngine:
+    """In-memory free-slot index for every doctor over a rolling horizon.
+
+    Schedules are parsed once into minute intervals and each working day is
+    materialized as a sorted list of free slot starts on a SLOT_MINUTES grid.
+    Bookings and cancellations update only the affected doctor/day, so
+    "earliest free slot in a specialty" is a bisect per doctor plus a heap
+    merge. The index is rebuilt from the database when the day rolls over or
+    after ``refresh_interval`` seconds, which picks up writes made by other
+    server processes; the database stays the authority when booking.
+    """
+
+    def __init__(self, database: "HospitalDatabase", horizon_days: int = 14, refresh_interval: float = 300.0):
+        self.database = database
+        self.horizon_days = horizon_days
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._built_on: Optional[date] = None
+        self._built_at = 0.0
+        self._schedules: Dict[str, DoctorSchedule] = {}
+        self._by_specialty: Dict[str, List[str]] = {}
+        # (doctor_id, "YYYY-MM-DD") -> sorted booked start minutes / sorted free slot starts
+        self._booked: Dict[Tuple[str, str], List[int]] = {}
+        self._free: Dict[Tuple[str, str], List[int]] = {}
+        self._days: List[date] = []
+
+    def invalidate(self):
+        with self._lock:
+            self._built_on = None
+
+    def _ensure_fresh(self):
+        if self._built_on != date.today() or time.monotonic() - self._built_at > self.refresh_interval:
+            self._rebuild()
+
+    def _rebuild(self):
+        today = date.today()
+        days = [today + timedelta(days=n) for n in range(self.horizon_days)]
+        schedules, by_specialty, booked = {}, {}, {}
+        with self.database.get_connection() as conn:
+            for did, name, specialty, avail_days, avail_times, fee in conn.execute(
+                "SELECT id, name, specialty, available_days, available_times, consultation_fee "
+                "FROM doctors ORDER BY id"
+            ):
+                schedules[did] = DoctorSchedule.parse(did, name, specialty, avail_days, avail_times, fee)
+                by_specialty.setdefault(specialty.lower(), []).append(did)
+            # Every active booking in the horizon in one pass, grouped per (doctor, day)
+            for did, appt_date, appt_time in conn.execute(
+                "SELECT doctor_id, appointment_date, appointment_time FROM appointments "
+                "WHERE appointment_date BETWEEN ? AND ? AND status != 'cancelled'",
+                (str(days[0]), str(days[-1]))
+            ):
+                if did not in schedules:
+                    continue
+                try:
+                    bisect.insort(booked.setdefault((did, appt_date), []), _to_minutes(appt_time))
+                except ValueError:
+                    continue
+        self._schedules, self._by_specialty, self._booked, self._days = schedules, by_specialty, booked, days
+        self._free = {
+            (did, str(day)): schedule.free_slots(booked.get((did, str(day))))
+            for did, schedule in schedules.items()
+            for day in days
+            if day.weekday() in schedule.weekdays
+        }
+        self._built_on, self._built_at = today, time.monotonic()
+
+    def _update(self, doctor_id: str, appt_date: str, appt_time: str, booking: bool):
+        with self._lock:
+            if self._built_on is None:
+                return  # next query rebuilds from the database anyway
+            schedule = self._schedules.get(doctor_id)
+            key = (doctor_id, appt_date)
+            if schedule is None or key not in self._free:
+                return  # outside the horizon or not a working day
+            minute = _to_minutes(appt_time)
+            booked = self._booked.setdefault(key, [])
+            if booking:
+                bisect.insort(booked, minute)
+            elif minute in booked:
+                booked.remove(minute)
+            self._free[key] = schedule.free_slots(booked)
+
+    def book(self, doctor_id: str, appt_date: str, appt_time: str):
+        self._update(doctor_id, appt_date, appt_time, booking=True)
+
+    def release(self, doctor_id: str, appt_date: str, appt_time: str):
+        self._update(doctor_id, appt_date, appt_time, booking=False)
+
+    def schedule(self, doctor_id: str) -> Optional[DoctorSchedule]:
+        with self._lock:
+            self._ensure_fresh()
+            return self._schedules.get(doctor_id.strip())
+
+    def _doctor_slots(self, doctor_id: str, days: List[date], now_minute: int) -> Iterator[Tuple[str, int, str]]:
+        today = self._built_on
+        for day in days:
+            free = self._free.get((doctor_id, str(day)))
+            if not free:
+                continue
+            start = bisect.bisect_left(free, now_minute) if day == today else 0
+            for minute in free[start:]:
+                yield str(day), minute, doctor_id
+
+    def find(self, specialty: str = "", doctor_id: str = "", on_date: Optional[date] = None,
+             limit: int = 5) -> List[Tuple[DoctorSchedule, str, str]]:
+        """Earliest free slots (schedule, date, HH:MM), across every matching doctor in time order"""
+        with self._lock:
+            self._ensure_fresh()
+            if doctor_id.strip():
+                schedule = self._schedules.get(doctor_id.strip())
+                matches = schedule is not None and (
+                    not specialty.strip() or schedule.specialty.lower() == specialty.strip().lower()
+                )
+                doctor_ids = [schedule.doctor_id] if matches else []
+            elif specialty.strip():
+                doctor_ids = self._by_specialty.get(specialty.strip().lower(), [])
+            else:
+                doctor_ids = list(self._schedules)
+            days = [on_date] if on_date is not None else self._days
+            now = datetime.now()
+            now_minute = now.hour * 60 + now.minute + 1  # a slot that already started is not bookable
+            merged = heapq.merge(*(self._doctor_slots(did, days, now_minute) for did in doctor_ids))
+            return [
+                (self._schedules[did], day, _to_hhmm(minute))
+                for day, minute, did in itertools.islice(merged, max(limit, 0))
+            ]
+
+
+# Full-text search: per entity, a unicode61 index (whole-word and prefix matches) and a trigram
+# index (substrings, typos). FTS rows carry the entity id and are joined back on it. Their rowid is
+# the entity's key in {table}_search_keys, an INTEGER PRIMARY KEY that VACUUM leaves alone, so the
+# triggers can delete by rowid instead of scanning the UNINDEXED id column.
+_PHONE_TAIL = "substr(replace(replace({row}.phone, '-', ''), ' ', ''), -4)"
+
+
+class SearchIndex(NamedTuple):
+    key: str                    # FTS column holding the entity id
+    columns: Dict[str, str]     # unicode61 column -> SQL expression over the entity row
+    trigram_columns: Tuple[str, ...]
+    source_columns: str         # entity columns whose updates re-index the row
+
+
+SEARCH_INDEXES = {
+    "patients": SearchIndex("patient_id", {"name": "{row}.name", "phone_tail": _PHONE_TAIL}, ("name",),
+                            "id, name, phone"),
+    "doctors": SearchIndex("doctor_id", {"name": "{row}.name", "specialty": "{row}.specialty"},
+                           ("name", "specialty"), "id, name, specialty"),
+}
+# Candidates fetched per search stage; ranking happens on at most this many rows per stage
+SEARCH_CANDIDATES = 50
+# Fuzzy matches whose closest run of words is less similar than this to the query are dropped
+MIN_FUZZY_SIMILARITY = 0.7
+
+
+def _search_index_statements(table: str, index: SearchIndex) -> List[str]:
+    """CREATE statements for ``table``'s search keys, two FTS tables and sync triggers, plus (re-)filling them"""
+    keys = f"{table}_search_keys"
+    key_of = f"(SELECT key FROM {keys} WHERE id = {{row}}.id)"
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {keys} (key INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE)",
+        f"DELETE FROM {keys} WHERE id NOT IN (SELECT id FROM {table})",
+        f"INSERT OR IGNORE INTO {keys} (id) SELECT id FROM {table}",
+    ]
+    inserts, deletes = [], []
+    for fts, columns, options in (
+        (f"{table}_fts", index.columns, "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'"),
+        (f"{table}_trigram", {c: index.columns[c] for c in index.trigram_columns}, "tokenize = 'trigram'"),
+    ):
+        names = ", ".join(columns)
+        statements.append(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({index.key} UNINDEXED, {names}, {options})")
+        selected = ", ".join(expr.format(row=table) for expr in columns.values())
+        statements.append(f"DELETE FROM {fts}")
+        statements.append(f"INSERT INTO {fts} (rowid, {index.key}, {names}) SELECT k.key, {table}.id, {selected} "
+                          f"FROM {table} JOIN {keys} k ON k.id = {table}.id")
+        values = ", ".join(expr.format(row="new") for expr in columns.values())
+        inserts.append(f"INSERT INTO {fts} (rowid, {index.key}, {names}) VALUES ({key_of.format(row='new')}, new.id, {values});")
+        deletes.append(f"DELETE FROM {fts} WHERE rowid = {key_of.format(row='old')};")
+    statements += [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {keys} (id) VALUES (new.id); {' '.join(inserts)} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} "
+        f"BEGIN {' '.join(deletes)} DELETE FROM {keys} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {index.source_columns} ON {table} "
+        f"BEGIN {' '.join(deletes)} UPDATE {keys} SET id = new.id WHERE id = old.id; {' '.join(inserts)} END",
+    ]
+    return statements
+
+
+def _search_tokens(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _phrase(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+
+def _typo_variants(token: str, half_prefix: bool) -> str:
+    """FTS5 OR-expression for words one extra or swapped character away from ``token``;
+    with ``half_prefix`` also any word sharing the first half of a longer token (a wrong character)"""
+    variants = {token}
+    variants.update(token[:i] + token[i + 1:] for i in range(len(token)))
+    variants.update(token[:i] + token[i + 1] + token[i] + token[i + 2:] for i in range(len(token) - 1))
+    variants.discard("")
+    terms = [_phrase(v) for v in sorted(variants)]
+    if half_prefix and len(token) >= 4:
+        terms.append(_phrase(token[:len(token) // 2]) + "*")
+    return " OR ".join(terms)
+
+
+def _search_stages(table: str, query: str, tokens: List[str]) -> List[Tuple[str, str, str, float]]:
+    """(match kind, FTS table, MATCH expression, rank weight) in the order they are tried"""
+    if re.fullmatch(r"[\d\s\-+]+", query.strip()):
+        # Phone numbers only ever match phone numbers, never names by shared digits or trigrams
+        digits = re.sub(r"\D", "", query)
+        if "phone_tail" in SEARCH_INDEXES[table].columns and len(digits) >= 4:
+            return [("phone", f"{table}_fts", f"phone_tail : {_phrase(digits[-4:])}", 3)]
+        return []
+    stages = []
+    stages.append(("exact", f"{table}_fts", " ".join(_phrase(t) for t in tokens), 2))
+    stages.append(("prefix", f"{table}_fts", " ".join(_phrase(t) + "*" for t in tokens), 1))
+    # Substring: every word (3+ characters) appears somewhere in the row, e.g. "anguo" in "Jianguo"
+    words = [t for t in tokens if len(t) >= 3]
+    if words:
+        stages.append(("substring", f"{table}_trigram", " AND ".join(_phrase(t) for t in words), 0.5))
+    # Typos: each word may have an extra or swapped character; then also a wrong one in its second half
+    for half_prefix in (False, True):
+        stages.append(("fuzzy", f"{table}_fts", " AND ".join(f"({_typo_variants(t, half_prefix)})" for t in tokens), 0))
+    # Last resort: rows sharing any trigram with the query
+    if words:
+        grams = dict.fromkeys(t[i:i + 3] for t in words for i in range(len(t) - 2))
+        stages.append(("fuzzy", f"{table}_trigram", " OR ".join(_phrase(g) for g in grams), 0))
+    return stages
+
 
 class HospitalDatabase:
-    def __init__(self, db_path=_DEFAULT_DB_PATH):
+    # Versioned schema migrations; PRAGMA user_version records how many have been applied.
+    MIGRATIONS = [
+        # v1: secondary indexes for the hot lookups
+        (
+            "CREATE INDEX IF NOT EXISTS idx_doctors_specialty ON doctors (LOWER(specialty), name)",
+            "CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (LOWER(name))",
+            "CREATE INDEX IF NOT EXISTS idx_appointments_doctor_slot "
+            "ON appointments (doctor_id, appointment_date, appointment_time, status)",
+            "CREATE INDEX IF NOT EXISTS idx_appointments_patient "
+            "ON appointments (patient_id, appointment_date, appointment_time)",
+        ),
+        # v2: at most one active appointment per doctor slot, enforced by the database.
+        # Existing double bookings keep the earliest row; the rest are cancelled first.
+        # The partial unique index serves the slot lookups, so the v1 slot index goes.
+        (
+            "UPDATE appointments SET status = 'cancelled', "
+            "notes = COALESCE(notes || '; ', '') || 'Cancelled by migration: duplicate booking of this slot' "
+            "WHERE status != 'cancelled' AND rowid NOT IN ("
+            "SELECT MIN(rowid) FROM appointments WHERE status != 'cancelled' "
+            "GROUP BY doctor_id, appointment_date, appointment_time)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_active_slot "
+            "ON appointments (doctor_id, appointment_date, appointment_time) WHERE status != 'cancelled'",
+            "DROP INDEX IF EXISTS idx_appointments_doctor_slot",
+        ),
+        # v3: FTS5 search indexes over patients and doctors, keyed on {table}_search_keys and
+        # kept in sync by triggers
+        tuple(statement for table, index in SEARCH_INDEXES.items()
+              for statement in _search_index_statements(table, index)),
+        # v4: the slot engine loads every active booking in its horizon with one date-range query
+        (
+            "CREATE INDEX IF NOT EXISTS idx_appointments_active_date "
+            "ON appointments (appointment_date, doctor_id, appointment_time) WHERE status != 'cancelled'",
+        ),
+    ]
+
+    def __init__(self, db_path=_DEFAULT_DB_PATH, pool_size: int = 8, cache_ttl: float = 300.0):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_connections=pool_size)
+        # Doctors and specialties rarely change; writes to them must call invalidate_reference_cache().
+        self.reference_cache = TTLCache(maxsize=256, ttl=cache_ttl)
+        self.slots = SlotEngine(self, refresh_interval=cache_ttl)
         self.init_database()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        return self.pool.connection()
+
+    def close(self):
+        self.pool.close()
 
     def init_database(self):
         print("Initialising hospital database...")
@@ -54,9 +405,23 @@ class HospitalDatabase:
                     FOREIGN KEY (doctor_id) REFERENCES doctors(id)
                 )
             """)
+            self._migrate(conn)
             if conn.execute("SELECT COUNT(*) FROM doctors").fetchone()[0] == 0:
                 self._insert_sample_data(conn)
             conn.commit()
+        self.invalidate_reference_cache()
+
+    def invalidate_reference_cache(self):
+        self.reference_cache.invalidate()
+        self.slots.invalidate()
+
+    def _migrate(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(self.MIGRATIONS) + 1):
+            print(f"Applying hospital database migration v{target}...")
+            for statement in self.MIGRATIONS[target - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
 
     def _insert_sample_data(self, conn):
         print("Inserting hospital sample data...")
@@ -95,12 +460,23 @@ class HospitalDatabase:
     # ── Queries ───────────────────────────────────────────────────────────────
 
     def get_specialties(self):
+        return list(self.reference_cache.get_or_load(("specialties",), self._load_specialties))
+
+    def get_doctors(self, specialty: str = ""):
+        key = ("doctors", specialty.strip().lower())
+        return list(self.reference_cache.get_or_load(key, lambda: self._load_doctors(specialty)))
+
+    def get_doctor(self, doctor_id: str):
+        key = ("doctor", doctor_id.strip())
+        return self.reference_cache.get_or_load(key, lambda: self._load_doctor(doctor_id))
+
+    def _load_specialties(self):
         with self.get_connection() as conn:
             return conn.execute(
                 "SELECT specialty, COUNT(*) FROM doctors GROUP BY specialty ORDER BY specialty"
             ).fetchall()
 
-    def get_doctors(self, specialty: str = ""):
+    def _load_doctors(self, specialty: str):
         with self.get_connection() as conn:
             if specialty.strip():
                 return conn.execute(
@@ -113,7 +489,7 @@ class HospitalDatabase:
                 "FROM doctors ORDER BY specialty, name"
             ).fetchall()
 
-    def get_doctor(self, doctor_id: str):
+    def _load_doctor(self, doctor_id: str):
         with self.get_connection() as conn:
             return conn.execute(
                 "SELECT id, name, specialty, title, available_days, available_times, consultation_fee "
@@ -132,6 +508,142 @@ class HospitalDatabase:
                 (doctor_id, str(today), next_week)
             ).fetchall()
 
+    def get_schedules(self, start: date, end: date, specialty: str = "", doctor_ids: Optional[List[str]] = None):
+        """Schedules and bookings of many doctors for [start, end] in one grouped query.
+
+        Returns one dict per doctor with its row, parsed ``schedule``, and per
+        working day the ``booked`` and ``free`` slot times (HH:MM); days the
+        doctor does not work are absent from both.
+        """
+        sql = (
+            "SELECT d.id, d.name, d.specialty, d.title, d.available_days, d.available_times, d.consultation_fee, "
+            "group_concat(a.appointment_date || ' ' || a.appointment_time) "
+            "FROM doctors d LEFT JOIN appointments a ON a.doctor_id = d.id "
+            "AND a.appointment_date >= ? AND a.appointment_date <= ? AND a.status != 'cancelled' "
+        )
+        params = [str(start), str(end)]
+        if doctor_ids:
+            sql += f"WHERE d.id IN ({','.join('?' * len(doctor_ids))}) "
+            params += [doctor_id.strip() for doctor_id in doctor_ids]
+            if specialty.strip():
+                sql += "AND LOWER(d.specialty) = LOWER(?) "
+                params.append(specialty.strip())
+        elif specialty.strip():
+            sql += "WHERE LOWER(d.specialty) = LOWER(?) "
+            params.append(specialty.strip())
+        sql += "GROUP BY d.id ORDER BY d.specialty, d.name"
+        with self.get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        now = datetime.now()
+        schedules = []
+        for *row, bookings in rows:
+            schedule = DoctorSchedule.parse(row[0], row[1], row[2], row[4], row[5], row[6])
+            booked_by_day: Dict[str, List[int]] = {}
+            for slot in sorted(bookings.split(",")) if bookings else ():
+                appt_date, _, appt_time = slot.partition(" ")
+                try:
+                    booked_by_day.setdefault(appt_date, []).append(_to_minutes(appt_time))
+                except ValueError:
+                    continue
+            booked, free = {}, {}
+            for day in days:
+                if day.weekday() not in schedule.weekdays:
+                    continue
+                minutes = booked_by_day.get(str(day), [])
+                open_slots = schedule.free_slots(minutes)
+                if day == now.date():
+                    open_slots = [m for m in open_slots if m > now.hour * 60 + now.minute]
+                booked[str(day)] = [_to_hhmm(m) for m in minutes]
+                free[str(day)] = [_to_hhmm(m) for m in open_slots]
+            schedules.append({"row": tuple(row), "schedule": schedule, "booked": booked, "free": free})
+        return schedules
+
+    def search_patients(self, query: str, limit: int = 10):
+        """Ranked patient search by name (whole words, prefixes, typos) or phone number suffix.
+
+        Returns (id, name, date_of_birth, gender, phone, match, score) tuples, best first.
+        """
+        return self._ranked_search("patients", "t.id, t.name, t.date_of_birth, t.gender, t.phone", (1,), query, limit,
+                                   phone_column=4)
+
+    def search_doctors(self, query: str, limit: int = 10):
+        """Ranked doctor search by name or specialty; rows are shaped like get_doctors() plus (match, score)"""
+        return self._ranked_search(
+            "doctors",
+            "t.id, t.name, t.specialty, t.title, t.hospital, t.available_days, t.available_times, t.consultation_fee",
+            (1, 2), query, limit,
+        )
+
+    def _ranked_search(self, table: str, select: str, text_columns: Tuple[int, ...], query: str, limit: int,
+                       phone_column: Optional[int] = None):
+        """Run the search stages until ``limit`` rows are found, then rank by stage and similarity.
+
+        Each stage reads at most SEARCH_CANDIDATES rows straight off the FTS index.
+        Fuzzy matches below MIN_FUZZY_SIMILARITY and phone matches on the last four
+        digits only are dropped rather than ranked last.
+        ORDER BY rank is avoided because bm25 has to score every match, which takes
+        tens of milliseconds for a common surname among a million patients.
+        """
+        tokens = _search_tokens(query)
+        if not tokens or limit < 1:
+            return []
+        matcher = difflib.SequenceMatcher(None, b=" ".join(tokens))
+        similarities = {}  # many patients share a name
+        digits = re.sub(r"\D", "", query)
+        found = {}
+        with self.get_connection() as conn:
+            for match, fts, expression, weight in _search_stages(table, query, tokens):
+                rows = conn.execute(
+                    f"SELECT {select} FROM (SELECT {SEARCH_INDEXES[table].key} AS ref FROM {fts} "
+                    f"WHERE {fts} MATCH ? LIMIT ?) m JOIN {table} t ON t.id = m.ref",
+                    (expression, SEARCH_CANDIDATES)
+                ).fetchall()
+                for row in rows:
+                    if row[0] in found:
+                        continue
+                    if match == "phone":
+                        # The index matched the last 4 digits; the rest of what was typed must match too
+                        if not re.sub(r"\D", "", row[phone_column]).endswith(digits):
+                            continue
+                        similarity = 1.0
+                    else:
+                        similarity = max(self._similarity(matcher, similarities, str(row[i])) for i in text_columns)
+                    if match == "fuzzy" and max(
+                        self._word_similarity(matcher, similarities, str(row[i]), len(tokens)) for i in text_columns
+                    ) < MIN_FUZZY_SIMILARITY:
+                        continue
+                    found[row[0]] = (*row, match, round(weight + similarity, 3))
+                if len(found) >= limit:
+                    break
+        return sorted(found.values(), key=lambda r: (-r[-1], r[1], r[0]))[:limit]
+
+    @staticmethod
+    def _similarity(matcher, cache, text: str) -> float:
+        text = text.lower()
+        if text not in cache:
+            matcher.set_seq1(text)
+            cache[text] = matcher.ratio()
+        return cache[text]
+
+    @classmethod
+    def _word_similarity(cls, matcher, cache, text: str, width: int) -> float:
+        """Best similarity between the query and any ``width`` consecutive words of ``text``"""
+        words = _search_tokens(text)
+        return max(
+            (cls._similarity(matcher, cache, " ".join(words[i:i + width])) for i in range(len(words) - width + 1)),
+            default=cls._similarity(matcher, cache, text),
+        )
+
+    def rebuild_search_index(self):
+        """Re-fill the search keys and FTS tables from patients/doctors"""
+        with self.get_connection() as conn:
+            for table, index in SEARCH_INDEXES.items():
+                for statement in _search_index_statements(table, index):
+                    conn.execute(statement)
+            conn.commit()
+
     def get_patient(self, query: str):
         with self.get_connection() as conn:
             return conn.execute(
@@ -157,16 +669,31 @@ class HospitalDatabase:
 
     def create_appointment(self, patient_id: str, doctor_id: str, appt_date: str,
                            appt_time: str, reason: str) -> str:
-        appt_id = str(uuid.uuid4())[:8].upper()
-        with self.get_connection() as conn:
-            conn.execute(
-                "INSERT INTO appointments (id, patient_id, doctor_id, appointment_date, appointment_time, "
-                "status, reason, created_at, notes) VALUES (?,?,?,?,?,?,?,?,?)",
-                (appt_id, patient_id, doctor_id, appt_date, appt_time,
-                 "scheduled", reason.strip(), datetime.now().isoformat(), None)
-            )
-            conn.commit()
-        return appt_id
+        """Book the slot in a single INSERT; raises SlotTakenError if it is already booked.
+
+        idx_appointments_active_slot makes the check and the write one atomic
+        step, so concurrent bookings of the same slot cannot both succeed. The
+        time is stored as zero-padded HH:MM so "9:00" and "09:00" are the same slot.
+        """
+        appt_time = canonical_time(appt_time)
+        for _ in range(3):
+            appt_id = str(uuid.uuid4())[:8].upper()
+            try:
+                with self.get_connection() as conn:
+                    conn.execute(
+                        "INSERT INTO appointments (id, patient_id, doctor_id, appointment_date, appointment_time, "
+                        "status, reason, created_at, notes) VALUES (?,?,?,?,?,?,?,?,?)",
+                        (appt_id, patient_id, doctor_id, appt_date, appt_time,
+                         "scheduled", reason.strip(), datetime.now().isoformat(), None)
+                    )
+                    conn.commit()
+            except sqlite3.IntegrityError as e:
+                if "appointments.id" in str(e):
+                    continue  # 8-character id collision; draw a new one
+                raise SlotTakenError(f"{doctor_id} is already booked at {appt_date} {appt_time}") from e
+            self.slots.book(doctor_id, appt_date, appt_time)
+            return appt_id
+        raise RuntimeError("Could not allocate a unique appointment id")
 
     def get_appointment(self, appt_id: str):
         with self.get_connection() as conn:
@@ -181,11 +708,22 @@ class HospitalDatabase:
 
     def cancel_appointment(self, appt_id: str, notes: str):
         with self.get_connection() as conn:
-            conn.execute(
-                "UPDATE appointments SET status = 'cancelled', notes = ? WHERE id = ?",
+            released = conn.execute(
+                "UPDATE appointments SET status = 'cancelled', notes = ? WHERE id = ? AND status != 'cancelled' "
+                "RETURNING doctor_id, appointment_date, appointment_time",
                 (notes, appt_id)
-            )
+            ).fetchone()
             conn.commit()
+        if released:
+            self.slots.release(*released)
+
+    def find_available_slots(self, specialty: str = "", doctor_id: str = "", on_date: Optional[date] = None,
+                             limit: int = 5):
+        return self.slots.find(specialty, doctor_id, on_date, limit)
+
+    def is_within_working_hours(self, doctor_id: str, appt_date: date, appt_time: str) -> bool:
+        schedule = self.slots.schedule(doctor_id)
+        return schedule is not None and schedule.within_hours(appt_date, _to_minutes(appt_time))
 
     def get_patient_appointments(self, patient_id: str, status_filter: str = "all"):
         with self.get_connection() as conn:
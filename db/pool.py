@@ -0,0 +1,174 @@
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+# PRAGMAs applied once per physical connection, right after it is opened.
+DEFAULT_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),      # ~16 MiB page cache per connection
+    ("mmap_size", 268435456),    # 256 MiB memory-mapped I/O
+)
+
+_pools = weakref.WeakSet()
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by the database classes.
+
+    A thread keeps the connection it checked out until its outermost ``with``
+    block exits, so nested calls (e.g. ``update_balance`` -> ``get_account``)
+    reuse the same handle. Leaving the outermost block commits (or rolls back
+    on error) and returns the connection to the pool, mirroring the
+    ``with sqlite3.connect(...) as conn`` semantics the callers rely on.
+    """
+
+    def __init__(self, db_path: str, max_connections: int = 8, timeout: float = 30.0,
+                 pragmas=DEFAULT_PRAGMAS):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.pragmas = tuple(pragmas)
+
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._idle = []
+        self._open = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._opened = 0
+        self._discarded = 0
+
+        _pools.add(self)
+
+    # ── Connection lifecycle ──────────────────────────────────────────────────
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        try:
+            for name, value in self.pragmas:
+                conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            self._checkouts += 1
+            if not self._idle and self._open >= self.max_connections:
+                self._waits += 1
+                while not self._idle and self._open >= self.max_connections:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        self._timeouts += 1
+                        raise sqlite3.OperationalError(
+                            f"Timed out waiting for a connection to {self.db_path}"
+                        )
+                    self._cond.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+
+        try:
+            conn = self._open_connection()
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection, discard: bool = False):
+        with self._cond:
+            if discard or self._closed:
+                self._open -= 1
+                self._discarded += 1
+            else:
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out this thread's connection for the duration of the block."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        discard = False
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+            raise
+        else:
+            try:
+                conn.commit()
+            except sqlite3.Error:
+                discard = True
+                raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn, discard)
+
+    def close(self):
+        """Close idle connections; connections still checked out close on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    # ── Introspection ─────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "db_path": self.db_path,
+                "max_connections": self.max_connections,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "opened": self._opened,
+                "discarded": self._discarded,
+                "closed": self._closed,
+            }
+
+
+@atexit.register
+def _close_all_pools():
+    for pool in list(_pools):
+        pool.close()
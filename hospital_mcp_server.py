@@ -1,10 +1,24 @@
-import json
+import os
 from fastmcp import FastMCP
-from datetime import datetime, date
-from db.hospital_db import hospital_db
+from datetime import datetime, date, timedelta
+from typing import List, Optional
+from db.async_db import async_hospital_db
+from db.hospital_db import SLOT_MINUTES, SlotTakenError, canonical_time
+from utils.encoding import ResponseEncoder
 
 mcp_hospital = FastMCP(name="hospital-appointment-server")
 
+# Response format for every tool, per deployment: pretty / compact / columnar / structured.
+# Tools are registered with output_schema=None: otherwise FastMCP wraps the str return type in a
+# {"result": ...} schema and sends every response twice (text + structured copy).
+response_encoder = ResponseEncoder(os.getenv("HOSPITAL_OUTPUT_MODE", "pretty"))
+
+# Search score a misspelled specialty must reach before hospital_list_doctors substitutes it
+MIN_SPECIALTY_MATCH_SCORE = 0.6
+
+MAX_SCHEDULE_DAYS = 31
+MAX_SCHEDULE_DOCTORS = 50
+
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
@@ -21,18 +35,19 @@ def _mask_phone(phone: str) -> str:
     return f"{digits[:3]}****{digits[-4:]}"
 
 
-def _ok(data: dict) -> str:
-    return json.dumps(data, ensure_ascii=False, indent=2)
+def _ok(data: dict):
+    return response_encoder.encode(data)
 
 
-def _err(message: str) -> str:
-    return json.dumps({"error": message}, ensure_ascii=False)
+def _err(message: str):
+    return response_encoder.encode({"error": message})
 
 
 # ── Tools ─────────────────────────────────────────────────────────────────────
 
 @mcp_hospital.tool(
     name="hospital_list_specialties",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to browse available medical departments or specialties "
         "at the hospital, or when they need to know which specialty to choose before looking up doctors. "
@@ -41,8 +56,8 @@ def _err(message: str) -> str:
         "Returns a structured list of specialties with doctor counts."
     )
 )
-def hospital_list_specialties() -> str:
-    rows = hospital_db.get_specialties()
+async def hospital_list_specialties() -> str:
+    rows = await async_hospital_db.get_specialties()
     if not rows:
         return _err("No specialties found.")
     return _ok({
@@ -55,6 +70,7 @@ def hospital_list_specialties() -> str:
 
 @mcp_hospital.tool(
     name="hospital_list_doctors",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to find doctors, browse doctor profiles, check availability, "
         "or compare consultation fees. Accepts an optional specialty filter. "
@@ -63,11 +79,20 @@ def hospital_list_specialties() -> str:
         "Returns doctor_id (required for booking), name, title, specialty, available days/times, and fee."
     )
 )
-def hospital_list_doctors(specialty: str = "") -> str:
-    rows = hospital_db.get_doctors(specialty)
+async def hospital_list_doctors(specialty: str = "") -> str:
+    rows = await async_hospital_db.get_doctors(specialty)
+    note = {}
+    if not rows and specialty.strip():
+        # Misspelled or partial specialty ("cardio", "dermatolgy"): list the closest one instead
+        matches = await async_hospital_db.search_doctors(specialty, 1)
+        if matches and matches[0][-1] >= MIN_SPECIALTY_MATCH_SCORE:
+            closest = matches[0][2]
+            rows = await async_hospital_db.get_doctors(closest)
+            note = {"note": f"No specialty named '{specialty}'; showing {closest}."}
     if not rows:
         return _err(f"No doctors found{' for specialty: ' + specialty if specialty else ''}.")
     return _ok({
+        **note,
         "doctors": [
             {
                 "doctor_id": did,
@@ -86,21 +111,23 @@ def hospital_list_doctors(specialty: str = "") -> str:
 
 @mcp_hospital.tool(
     name="hospital_get_doctor_schedule",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to check a specific doctor's booked time slots for the next 7 days "
         "to find an available appointment time. Requires a doctor_id (e.g. 'D001'). "
         "Do NOT use this tool to list all doctors or browse specialties — "
         "use hospital_list_doctors or hospital_list_specialties for that. "
-        "Returns the doctor's working days, hours, and already-booked slots."
+        "Returns the doctor's working days, hours, and already-booked slots. "
+        "To get bookable times directly, use hospital_find_available_slots."
     )
 )
-def hospital_get_doctor_schedule(doctor_id: str) -> str:
-    row = hospital_db.get_doctor(doctor_id)
+async def hospital_get_doctor_schedule(doctor_id: str) -> str:
+    row = await async_hospital_db.get_doctor(doctor_id)
     if not row:
         return _err(f"Doctor {doctor_id} not found.")
 
     did, name, specialty, title, avail_days, avail_times, fee = row
-    bookings = hospital_db.get_doctor_bookings(doctor_id)
+    bookings = await async_hospital_db.get_doctor_bookings(doctor_id)
 
     return _ok({
         "doctor_id": did,
@@ -117,8 +144,140 @@ def hospital_get_doctor_schedule(doctor_id: str) -> str:
     })
 
 
+@mcp_hospital.tool(
+    name="hospital_find_available_slots",
+    output_schema=None,
+    description=(
+        "Use this tool when the user wants the earliest free appointment times, e.g. "
+        "'first available cardiologist' or 'when can Dr. Chen see me on Friday'. "
+        "Accepts an optional specialty, doctor_id and date (YYYY-MM-DD); searches all doctors "
+        f"in the specialty across the next {async_hospital_db.slots.horizon_days} days in 30-minute slots, "
+        "earliest first. "
+        "Do NOT use this tool to book — pass the returned doctor_id, date and time to hospital_book_appointment. "
+        "Returns up to `limit` free slots with doctor_id, doctor name, date, time and fee."
+    )
+)
+async def hospital_find_available_slots(
+    specialty: str = "",
+    doctor_id: str = "",
+    appointment_date: str = "",
+    limit: int = 5,
+) -> str:
+    horizon = async_hospital_db.slots.horizon_days
+    on_date = None
+    if appointment_date.strip():
+        try:
+            on_date = datetime.strptime(appointment_date.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            return _err("appointment_date must be in YYYY-MM-DD format.")
+        if on_date < date.today():
+            return _err("appointment_date cannot be in the past.")
+        last_day = date.today() + timedelta(days=horizon - 1)
+        if on_date > last_day:
+            return _err(f"appointment_date must be within the next {horizon} days (on or before {last_day}).")
+
+    slots = await async_hospital_db.find_available_slots(specialty, doctor_id, on_date, min(max(limit, 1), 50))
+    if not slots:
+        scope = " ".join(filter(None, [specialty.strip(), doctor_id.strip()]))
+        when = f"on {on_date}" if on_date else f"in the next {horizon} days"
+        return _err(f"No free slots found{' for ' + scope if scope else ''} {when}.")
+
+    return _ok({
+        "earliest": {"doctor_id": slots[0][0].doctor_id, "date": slots[0][1], "time": slots[0][2]},
+        "slots": [
+            {
+                "doctor_id": schedule.doctor_id,
+                "doctor_name": schedule.name,
+                "specialty": schedule.specialty,
+                "date": slot_date,
+                "weekday": datetime.strptime(slot_date, "%Y-%m-%d").strftime("%a"),
+                "time": slot_time,
+                "consultation_fee": schedule.fee,
+            }
+            for schedule, slot_date, slot_time in slots
+        ],
+    })
+
+
+@mcp_hospital.tool(
+    name="hospital_get_schedules",
+    output_schema=None,
+    description=(
+        "Use this tool when the user wants to compare availability of several doctors at once, "
+        "e.g. all doctors in a specialty or a shortlist of doctor_ids, over a date range. "
+        "Accepts specialty and/or doctor_ids, plus start_date and end_date (YYYY-MM-DD, default: the next 7 days, "
+        f"at most {MAX_SCHEDULE_DAYS} days). "
+        "Do NOT call hospital_get_doctor_schedule once per doctor for comparisons — use this tool. "
+        "Do NOT use this tool to book — use hospital_book_appointment. "
+        "Returns each doctor's profile and an availability matrix: per date, each doctor's free 30-minute slots "
+        "(null when the doctor does not work that day), plus the booked slots."
+    )
+)
+async def hospital_get_schedules(
+    specialty: str = "",
+    doctor_ids: Optional[List[str]] = None,
+    start_date: str = "",
+    end_date: str = "",
+) -> str:
+    doctor_ids = [d.strip() for d in doctor_ids or () if d and d.strip()]
+    if not specialty.strip() and not doctor_ids:
+        return _err("Provide a specialty or at least one doctor_id.")
+    if len(doctor_ids) > MAX_SCHEDULE_DOCTORS:
+        return _err(f"At most {MAX_SCHEDULE_DOCTORS} doctor_ids per call.")
+
+    try:
+        start = datetime.strptime(start_date.strip(), "%Y-%m-%d").date() if start_date.strip() else date.today()
+        end = datetime.strptime(end_date.strip(), "%Y-%m-%d").date() if end_date.strip() else start + timedelta(days=6)
+    except ValueError:
+        return _err("start_date and end_date must be in YYYY-MM-DD format.")
+    if start < date.today():
+        return _err("start_date cannot be in the past.")
+    if end < start:
+        return _err("end_date must not be before start_date.")
+    if (end - start).days >= MAX_SCHEDULE_DAYS:
+        return _err(f"The date range can cover at most {MAX_SCHEDULE_DAYS} days.")
+
+    schedules = await async_hospital_db.get_schedules(start, end, specialty, doctor_ids)
+    if not schedules:
+        return _err("No matching doctors found.")
+    missing = sorted(set(doctor_ids) - {s["schedule"].doctor_id for s in schedules})
+
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    return _ok({
+        "start_date": str(start),
+        "end_date": str(end),
+        "doctors": [
+            {
+                "doctor_id": did,
+                "name": name,
+                "title": title,
+                "specialty": spec,
+                "working_days": avail_days.split(","),
+                "working_hours": avail_times.split(","),
+                "consultation_fee": fee,
+                "free_slot_count": sum(len(times) for times in s["free"].values()),
+                "booked_slots": [
+                    {"date": d, "time": t} for d, times in s["booked"].items() for t in times
+                ],
+            }
+            for s in schedules
+            for did, name, spec, title, avail_days, avail_times, fee in [s["row"]]
+        ],
+        "availability": [
+            {
+                "date": str(day),
+                "weekday": day.strftime("%a"),
+                "free_slots": {s["schedule"].doctor_id: s["free"].get(str(day)) for s in schedules},
+            }
+            for day in days
+        ],
+        **({"not_found": missing} if missing else {}),
+    })
+
+
 @mcp_hospital.tool(
     name="hospital_get_patient_info",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to look up an existing patient's profile by name or patient ID. "
         "Do NOT use this tool to register a new patient — use hospital_register_patient for that. "
@@ -126,8 +285,8 @@ def hospital_get_doctor_schedule(doctor_id: str) -> str:
         "Sensitive fields (phone, ID number) are masked. Returns patient_id for use in other tools."
     )
 )
-def hospital_get_patient_info(query: str) -> str:
-    row = hospital_db.get_patient(query.strip())
+async def hospital_get_patient_info(query: str) -> str:
+    row = await async_hospital_db.get_patient(query.strip())
     if not row:
         return _err(f"Patient '{query}' not found.")
 
@@ -142,8 +301,45 @@ def hospital_get_patient_info(query: str) -> str:
     })
 
 
+@mcp_hospital.tool(
+    name="hospital_search_patients",
+    output_schema=None,
+    description=(
+        "Use this tool when the user refers to a patient by a partial, misspelled or uncertain name, "
+        "or by the last digits of their phone number, e.g. 'Alise Wong', 'Zhang', '0001'. "
+        "Do NOT use this tool when the exact name or patient_id is known — use hospital_get_patient_info. "
+        "Do NOT use this tool to register patients — use hospital_register_patient. "
+        "Returns up to `limit` patients ranked best first, each with patient_id, name, date of birth, "
+        "masked phone, and how it matched (phone / exact / prefix / substring / fuzzy)."
+    )
+)
+async def hospital_search_patients(query: str, limit: int = 10) -> str:
+    if not query or not query.strip():
+        return _err("Missing required field: query")
+    rows = await async_hospital_db.search_patients(query.strip(), min(max(limit, 1), 50))
+    if not rows:
+        return _err(f"No patients match '{query}'.")
+    return _ok({
+        "query": query,
+        "total": len(rows),
+        "patients": [
+            {
+                "patient_id": pid,
+                "name": name,
+                "date_of_birth": dob,
+                "gender": gender,
+                "phone": _mask_phone(phone),
+                "match": match,
+                "score": score,
+            }
+            for pid, name, dob, gender, phone, match, score in rows
+        ],
+    })
+
+
 @mcp_hospital.tool(
     name="hospital_book_appointment",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to book a new medical appointment for an existing patient. "
         "Requires: patient_name, doctor_id (from hospital_list_doctors), "
@@ -153,7 +349,7 @@ def hospital_get_patient_info(query: str) -> str:
         "Returns appointment_id and full booking details."
     )
 )
-def hospital_book_appointment(
+async def hospital_book_appointment(
     patient_name: str,
     doctor_id: str,
     appointment_date: str,
@@ -177,19 +373,19 @@ def hospital_book_appointment(
         return _err("appointment_date cannot be in the past.")
 
     try:
-        datetime.strptime(appointment_time.strip(), "%H:%M")
+        appointment_time = canonical_time(appointment_time)
     except ValueError:
         return _err("appointment_time must be in HH:MM format.")
 
-    patient_row = hospital_db.get_patient_by_name(patient_name)
+    patient_row = await async_hospital_db.get_patient_by_name(patient_name)
     if not patient_row:
         return _err(f"Patient '{patient_name}' not found. Please register first.")
     patient_id, pat_name = patient_row
 
-    doctor_row = hospital_db.get_doctor(doctor_id)
+    doctor_row = await async_hospital_db.get_doctor(doctor_id)
     if not doctor_row:
         return _err(f"Doctor '{doctor_id}' not found.")
-    doc_id, doc_name, specialty, _, avail_days, _, fee = doctor_row
+    doc_id, doc_name, specialty, _, avail_days, avail_times, fee = doctor_row
 
     weekday = appt_date.strftime("%a")
     if weekday not in avail_days:
@@ -197,14 +393,21 @@ def hospital_book_appointment(
             f"{doc_name} is not available on {weekday}. Working days: {avail_days}."
         )
 
-    if hospital_db.check_appointment_conflict(doc_id, appointment_date.strip(), appointment_time.strip()):
+    if not await async_hospital_db.is_within_working_hours(doc_id, appt_date, appointment_time):
         return _err(
-            f"{doc_name} already has a booking at {appointment_date} {appointment_time}. Please choose another time."
+            f"{appointment_time} is not a bookable start time for {doc_name}: appointments take "
+            f"{SLOT_MINUTES} minutes and start every {SLOT_MINUTES} minutes within {avail_times}. "
+            f"Use hospital_find_available_slots to pick a free time."
         )
 
-    appointment_id = hospital_db.create_appointment(
-        patient_id, doc_id, appointment_date.strip(), appointment_time.strip(), reason
-    )
+    try:
+        appointment_id = await async_hospital_db.create_appointment(
+            patient_id, doc_id, appointment_date.strip(), appointment_time, reason
+        )
+    except SlotTakenError:
+        return _err(
+            f"{doc_name} already has a booking at {appointment_date} {appointment_time}. Please choose another time."
+        )
 
     return _ok({
         "appointment_id": appointment_id,
@@ -215,7 +418,7 @@ def hospital_book_appointment(
         "doctor_name": doc_name,
         "specialty": specialty,
         "date": appointment_date.strip(),
-        "time": appointment_time.strip(),
+        "time": appointment_time,
         "reason": reason.strip(),
         "consultation_fee": fee,
         "note": "Please arrive 15 minutes early and bring your ID card.",
@@ -224,6 +427,7 @@ def hospital_book_appointment(
 
 @mcp_hospital.tool(
     name="hospital_cancel_appointment",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to cancel an existing scheduled appointment. "
         "Requires appointment_id (from hospital_book_appointment or hospital_get_patient_appointments). "
@@ -232,9 +436,9 @@ def hospital_book_appointment(
         "Returns the updated appointment status and details."
     )
 )
-def hospital_cancel_appointment(appointment_id: str, reason: str = "") -> str:
+async def hospital_cancel_appointment(appointment_id: str, reason: str = "") -> str:
     appt_id = appointment_id.strip().upper()
-    row = hospital_db.get_appointment(appt_id)
+    row = await async_hospital_db.get_appointment(appt_id)
     if not row:
         return _err(f"Appointment '{appt_id}' not found.")
 
@@ -246,7 +450,7 @@ def hospital_cancel_appointment(appointment_id: str, reason: str = "") -> str:
         return _err("Cannot cancel a completed appointment.")
 
     notes = f"Cancelled by patient. Reason: {reason}" if reason else "Cancelled by patient."
-    hospital_db.cancel_appointment(appt_id, notes)
+    await async_hospital_db.cancel_appointment(appt_id, notes)
 
     return _ok({
         "appointment_id": appt_id,
@@ -261,6 +465,7 @@ def hospital_cancel_appointment(appointment_id: str, reason: str = "") -> str:
 
 @mcp_hospital.tool(
     name="hospital_get_patient_appointments",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to view all appointments for a patient, "
         "optionally filtered by status (scheduled / completed / cancelled / all). "
@@ -270,13 +475,13 @@ def hospital_cancel_appointment(appointment_id: str, reason: str = "") -> str:
         "Returns a list of appointments, each with appointment_id for use in cancel or follow-up tools."
     )
 )
-def hospital_get_patient_appointments(patient_name: str, status_filter: str = "all") -> str:
-    patient_row = hospital_db.get_patient_by_name(patient_name)
+async def hospital_get_patient_appointments(patient_name: str, status_filter: str = "all") -> str:
+    patient_row = await async_hospital_db.get_patient_by_name(patient_name)
     if not patient_row:
         return _err(f"Patient '{patient_name}' not found.")
 
     patient_id, pat_name = patient_row
-    rows = hospital_db.get_patient_appointments(patient_id, status_filter.strip().lower())
+    rows = await async_hospital_db.get_patient_appointments(patient_id, status_filter.strip().lower())
 
     return _ok({
         "patient_id": patient_id,
@@ -301,6 +506,7 @@ def hospital_get_patient_appointments(patient_name: str, status_filter: str = "a
 
 @mcp_hospital.tool(
     name="hospital_register_patient",
+    output_schema=None,
     description=(
         "Use this tool when the user wants to register a new patient who does not yet exist in the system. "
         "Requires: name, date_of_birth (YYYY-MM-DD), gender (Male/Female), phone, id_number (national ID). "
@@ -309,7 +515,7 @@ def hospital_get_patient_appointments(patient_name: str, status_filter: str = "a
         "Returns patient_id which is needed for booking appointments."
     )
 )
-def hospital_register_patient(
+async def hospital_register_patient(
     name: str,
     date_of_birth: str,
     gender: str,
@@ -332,11 +538,11 @@ def hospital_register_patient(
     if gender not in ("Male", "Female"):
         return _err("gender must be 'Male' or 'Female'.")
 
-    existing = hospital_db.patient_exists(name, id_number)
+    existing = await async_hospital_db.patient_exists(name, id_number)
     if existing:
         return _err(f"Patient already registered with patient_id: {existing[0]}")
 
-    patient_id = hospital_db.create_patient(name, date_of_birth, gender, phone, id_number)
+    patient_id = await async_hospital_db.create_patient(name, date_of_birth, gender, phone, id_number)
 
     return _ok({
         "patient_id": patient_id,
@@ -0,0 +1,556 @@
+from fastmcp import FastMCP
+from typing import Dict, Any, List
+from db.database import TransferError
+from db.async_db import async_db
+from clients.api_client import api_client
+from clients.api_tools import register_api_tools
+from schemas.financial_models import FinancialProduct, UserInvestment
+from schemas.bank_models import TransferRequest
+from schemas.expense_models import validate_expense_items, validate_report_spec
+from hospital_mcp_server import mcp_hospital
+from reports.expense_report import build_expense_report, warm_template_cache
+from reports.bulk import run_bulk_reports
+from reports.delivery import delivery_from_env
+from reports.job_queue import Job, JobQueue, QueueFullError
+import sqlite3
+import asyncio
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Create FastMCP server instances
+mcp = FastMCP(name="api-integration-server")
+mcp_banking = FastMCP(name="banking-server")
+
+# Tools for the upstream APIs declared in config/api_config.yaml
+register_api_tools(mcp)
+
+
+@mcp.tool(
+    name="get_upstream_metrics",
+    description="Report circuit breaker state, retry/hedge counters and latency percentiles for each upstream API, plus response cache statistics."
+)
+async def get_upstream_metrics() -> dict:
+    return api_client.metrics()
+
+# 转账功能
+@mcp_banking.tool(
+    name="transfer_money",
+    description="Transfer money from one account to another. Args: from_account_id (source account), to_account_id (destination account), amount (transfer amount), description (optional transfer note). Returns a result message."
+)
+async def transfer_money(from_account_id: str, to_account_id: str, amount: float, description: str = None) -> str:
+    """Transfer function
+    
+    Args:
+        from_account_id: Source account ID
+        to_account_id: Destination account ID
+        amount: Transfer amount
+        description: Transfer description (optional)
+    """
+    # Balance check, both balance updates and the ledger insert run in one transaction
+    try:
+        receipt = await async_db.transfer(from_account_id, to_account_id, amount, description)
+    except TransferError as e:
+        return f"Error: {e}"
+    
+    return f"Transfer successful, transaction ID: {receipt.transaction.id}! From account: {format_card_number(receipt.from_account.card_number)} to account: {format_card_number(receipt.to_account.card_number)} amount: {amount} RMB"
+
+# 批量转账功能
+@mcp_banking.tool(
+    name="batch_transfer",
+    description="Execute many transfers in one call, e.g. payroll or bulk payouts. Args: transfers (list of {from_account_id, to_account_id, amount, description}), mode ('all_or_nothing' (default): any failure rolls back the whole batch; 'best_effort': failed items are skipped and the rest are applied). Transfers are applied in list order. Returns a per-item result list."
+)
+async def batch_transfer(transfers: List[TransferRequest], mode: str = "all_or_nothing") -> str:
+    """Batch transfer function
+    
+    Args:
+        transfers: Transfers to execute, in order
+        mode: 'all_or_nothing' or 'best_effort'
+    """
+    if mode not in ("all_or_nothing", "best_effort"):
+        return "Error: mode must be 'all_or_nothing' or 'best_effort'"
+    if not transfers:
+        return "Error: transfers must not be empty"
+    
+    results = await async_db.batch_transfer(transfers, all_or_nothing=(mode == "all_or_nothing"))
+    succeeded = sum(1 for r in results if r.status == "success")
+    failed = sum(1 for r in results if r.status == "failed")
+    
+    if succeeded == len(results):
+        header = f"Batch transfer successful: {succeeded}/{len(results)} transfers applied"
+    elif mode == "all_or_nothing":
+        header = f"Batch transfer rolled back: {failed} of {len(results)} transfers failed, nothing was applied"
+    else:
+        header = f"Batch transfer partially applied: {succeeded}/{len(results)} transfers applied"
+    
+    result = [header]
+    for r in results:
+        line = f"{r.index + 1}. {r.from_account} -> {r.to_account} {r.amount} RMB: {r.status}"
+        if r.transaction_id:
+            line += f" (transaction ID: {r.transaction_id})"
+        if r.error:
+            line += f" - {r.error}"
+        result.append(line)
+    
+    return "\n".join(result)
+
+# 查询余额功能
+@mcp_banking.tool(
+    name="check_balance",
+    description="Check the balance of a specific account. Args: account_id (account to check). Returns the current balance or error message."
+)
+async def check_balance(account_id: str) -> str:
+    """Check account balance
+    
+    Args:
+        account_id: Account ID
+    """
+    account = await async_db.get_account(account_id)
+    
+    if not account:
+        return f"Error: Account {account_id} does not exist"
+    
+    return f"Account name: ({account.name})\nCard number: {format_card_number(account.card_number)} \nCurrent balance: {account.balance} RMB"
+
+# 查询账户信息
+@mcp_banking.tool(
+    name="get_account_info",
+    description="Get information of a specific account. Args: account_name (account to query). Returns account id, name or error message."
+)
+async def get_account_info(account_name: str) -> str:
+    """Query account information
+    
+    Args:
+        account_name: Account name
+    """
+    account = await async_db.get_account_by_name(account_name)
+    
+    if not account:
+        return f"Error: Account {account_name} does not exist"
+    
+    return f"Account ID: {account.id}\nAccount name: {account.name}\n Card number: {format_card_number(account.card_number)}"
+
+# 查询交易历史功能
+@mcp_banking.tool(
+    name="get_transaction_history",
+    description="Get transaction history for an account, newest first. Args: account_id (account to query), limit (number of records per page, default 10, max 100), cursor (optional continuation token returned by a previous call, to fetch the next page). Returns formatted transaction list plus a next-page cursor when more records exist, or error message."
+)
+async def get_transaction_history(account_id: str, limit: int = 10, cursor: str = "") -> str:
+    """Query account transaction history
+    
+    Args:
+        account_id: Account ID
+        limit: Number of records to return (default 10)
+        cursor: Continuation token from a previous page (optional)
+    """
+    if limit <= 0 or limit > 100:
+        return "Error: limit must be between 1 and 100"
+    
+    account = await async_db.get_account(account_id)
+    
+    if not account:
+        return f"Error: Account {account_id} does not exist"
+    
+    try:
+        transactions, next_cursor = await async_db.get_transaction_page(account_id, limit, cursor.strip() or None)
+    except ValueError as e:
+        return f"Error: {e}"
+    
+    if not transactions:
+        if cursor:
+            return f"Account {account_id} has no more transaction records"
+        return f"Account {account_id} has no transaction records"
+    
+    result = [f"Account {account_id} ({account.name}) transaction history ({len(transactions)} records):"]
+    for i, t in enumerate(transactions, 1):
+        if t.from_account == account_id:
+            direction = "Outgoing"
+            other_account = t.to_account
+        else:
+            direction = "Incoming"
+            other_account = t.from_account
+        
+        result.append(
+            f"{i}. {t.timestamp.strftime('%Y-%m-%d %H:%M:%S')} "
+            f"{direction} {other_account} {t.amount} RMB "
+            f"{t.description or ''}"
+        )
+    
+    if next_cursor:
+        result.append(f"More records available. Next cursor: {next_cursor}")
+    
+    return "\n".join(result)
+
+# 列出所有账户功能
+@mcp_banking.tool(
+    name="list_accounts",
+    description="List all accounts in the system. Returns a formatted list of account IDs, names, and balances."
+)
+async def list_accounts() -> str:
+    """List all accounts"""
+    try:
+        accounts = await async_db.list_accounts()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return []
+    
+    if not accounts:
+        return "No accounts available"
+    
+    result = ["All accounts:"]
+    for account in accounts:
+        result.append(f"- {account[0]}: {account[1]} (Balance: {account[2]} RMB)")
+    
+    return "\n".join(result)
+
+def format_card_number(card_number: str) -> str:
+    """
+    Format bank card number as 6217...1234, showing only the first 4 and last 4 digits.
+    Example: '6222021234567890123' -> '6222...0123'
+    """
+    if not card_number or len(card_number) < 8:
+        return card_number or ""
+    return f"{card_number[:4]}...{card_number[-4:]}"
+
+
+# 填写报销表格
+# 初始假期天数配置
+_INITIAL_LEAVE_DAYS = 10
+
+# Report generation (openpyxl + upload) runs in worker processes; the tool only validates and enqueues
+report_queue = JobQueue(
+    max_workers=int(os.getenv("EXPENSE_REPORT_WORKERS", "0")) or None,
+    max_pending=int(os.getenv("EXPENSE_REPORT_QUEUE_SIZE", "32")),
+    initializer=warm_template_cache,
+)
+MAX_BULK_REPORTS = 500
+
+# Upload / optional disk copy of the built workbook, done in this process over a shared connection pool
+report_delivery = delivery_from_env()
+
+def _expense_report_spec(name="", period="", items="", sheet_type="local", project_name="", original_currency="USD",
+                         exchange_rate=7.2, output_filename=""):
+    """Validate fill_expense_report arguments; returns (spec, None) or (None, error message)"""
+    missing = [f for f, v in [("name", name), ("period", period), ("items", items)] if not v or not str(v).strip()]
+    if missing:
+        return None, f"Error: missing required fields: {', '.join(missing)}"
+
+    if sheet_type not in ("local", "overseas"):
+        return None, "Error: sheet_type must be 'local' or 'overseas'"
+
+    # Parsed and validated against the category whitelist in one pass; every bad item is reported
+    expense_items, errors = validate_expense_items(items, sheet_type)
+    if errors:
+        if len(errors) == 1 and not errors[0].startswith("item "):
+            return None, f"Error: {errors[0]}"
+        return None, "Error: invalid expense items:\n" + "\n".join(f"- {error}" for error in errors)
+
+    return {
+        "name": name,
+        "period": period,
+        "items": expense_items,
+        "sheet_type": sheet_type,
+        "project_name": project_name,
+        "original_currency": original_currency,
+        "exchange_rate": exchange_rate,
+        "output_filename": output_filename,
+    }, None
+
+
+@mcp.tool(
+    name="fill_expense_report",
+    description="""Use this tool when the user wants to fill in an expense report, generate a reimbursement form, submit expense claims, or create an expense Excel file.
+
+This tool fills the Excel expense report template (报销表格_202501.xlsx) and optionally uploads it to the file server.
+
+Parameters:
+- name: Employee name, required
+- period: Expense period, e.g. '2025-Jan', required
+- sheet_type: 'local' for domestic expenses (default) or 'overseas' for international expenses
+- items: JSON array string of expense items, required.
+  local format: [{"date": "2025-01-15", "details": "Client lunch", "category": "Meals", "amount": 150.0}, ...]
+  Valid local categories: Meals / Transportation / Entertainment / Medical / Communication / Electronics / Other
+  overseas format: [{"date": "2025-01-15", "details": "Flight ticket", "category": "Flight", "amount": 500.0}, ...]
+  Valid overseas categories: Flight / Accommodation / Ground Transport / Meals / Other / Communication
+  (the Chinese template category names, e.g. 餐食 or 旅费报销(机票), are accepted as well; amount must be a number)
+  (overseas amounts are in original currency; RMB conversion is auto-calculated via exchange rate)
+- project_name: Project name (overseas only)
+- original_currency: Currency code, e.g. 'USD' or 'HKD' (overseas only)
+- exchange_rate: Exchange rate to RMB (overseas only, e.g. 7.2 for USD)
+- output_filename: Output filename without extension (optional, auto-generated if blank)
+
+Any number of items is accepted: rows beyond one sheet (30 local / 34 overseas) continue on copies of the sheet,
+each starting with the totals carried over from the previous sheets. The finished job reports per-category subtotals and the RMB total.
+
+The report is generated in the background: this returns a job ID immediately.
+Poll get_expense_report_status with that job ID to get the upload URL of the generated Excel file."""
+)
+async def fill_expense_report(
+    name: str,
+    period: str,
+    items: str,
+    sheet_type: str = "local",
+    project_name: str = "",
+    original_currency: str = "USD",
+    exchange_rate: float = 7.2,
+    output_filename: str = ""
+) -> str:
+    spec, error = _expense_report_spec(
+        name, period, items, sheet_type, project_name, original_currency, exchange_rate, output_filename
+    )
+    if error:
+        return error
+    try:
+        job = report_queue.submit(build_expense_report, spec, finalize=report_delivery.deliver)
+    except QueueFullError as e:
+        return f"Error: {str(e)}"
+
+    return (
+        f"Expense report job queued.\n"
+        f"Job ID: {job.id}\n"
+        f"Use get_expense_report_status with this job ID to check progress and get the download URL."
+    )
+
+
+@mcp.tool(
+    name="fill_expense_reports_bulk",
+    description="""Generate expense reports for many employees in one call (e.g. month-end).
+
+Parameters:
+- reports: list of report specs, required. Each spec takes the same fields as fill_expense_report:
+  name, period, items (JSON array string or array), sheet_type, project_name, original_currency, exchange_rate, output_filename
+- bundle: also produce one zip file containing every generated workbook (default false)
+
+Each report counts as one job against the report queue's limit (workers + queue size), so a batch larger than the
+free capacity is rejected; split it into smaller batches.
+
+Reports are generated in parallel in the background: this returns a job ID immediately.
+Poll get_expense_report_status with that job ID for the per-report download URLs or errors."""
+)
+async def fill_expense_reports_bulk(reports: List[Dict[str, Any]], bundle: bool = False) -> str:
+    if not reports:
+        return "Error: reports must contain at least one report spec"
+    if len(reports) > MAX_BULK_REPORTS:
+        return f"Error: at most {MAX_BULK_REPORTS} reports per call, got {len(reports)}"
+
+    specs, errors = [], []
+    for index, report in enumerate(reports):
+        fields, field_errors = validate_report_spec(report)
+        if field_errors:
+            errors.append(f"[{index}] Error: invalid report spec: " + "; ".join(field_errors))
+            continue
+        spec, error = _expense_report_spec(**fields)
+        if error:
+            errors.append(f"[{index}] {error}")
+        else:
+            specs.append(spec)
+    if errors:
+        return "Invalid report specs, nothing was queued:\n" + "\n".join(errors)
+
+    try:
+        job = report_queue.submit_task(lambda: run_bulk_reports(report_queue, report_delivery, specs, bundle),
+                                       weight=len(specs))
+    except QueueFullError as e:
+        return f"Error: {str(e)}"
+
+    return (
+        f"Bulk expense report job queued ({len(specs)} reports).\n"
+        f"Job ID: {job.id}\n"
+        f"Use get_expense_report_status with this job ID to check progress and get the download URLs."
+    )
+
+
+@mcp.tool(
+    name="get_expense_report_status",
+    description="""Check the status of an expense report job started by fill_expense_report or fill_expense_reports_bulk.
+Args: job_id (returned by fill_expense_report / fill_expense_reports_bulk, required).
+Returns queued / running / done / failed; when done, includes the upload URL or saved file path."""
+)
+async def get_expense_report_status(job_id: str) -> str:
+    job = report_queue.get(job_id.strip())
+    if job is None:
+        return f"Error: no expense report job with ID {job_id} (unknown or expired)"
+
+    if job.status in (Job.QUEUED, Job.RUNNING):
+        return f"Expense report job {job.id} is {job.status}. Please check again shortly."
+    if job.status == Job.FAILED:
+        return f"Error: expense report job {job.id} failed — {job.error}"
+
+    result = job.result
+    if result.get("status") != "success":
+        return result["message"]
+    saved_info = f"\nFile saved to: {result['output_path']}" if result.get("output_path") else ""
+    return f"{result['message']}{saved_info}"
+
+# Leave request tool
+@mcp.tool(
+    name="submit_leave_request",
+    description="""Submit a leave request for an employee. Use this when someone wants to request time off, apply for leave, ask for leave, or submit a leave application.
+Args: name (employee name, required), leave_type (leave category: personal / sick / annual, required), start_date (start date in YYYY-MM-DD format, required), end_date (end date in YYYY-MM-DD format, required).
+Personal and sick leave are demo only — they show remaining days but do not actually deduct from any balance.
+Annual leave deducts from a 10-day annual leave balance.
+Returns a confirmation message with leave details and remaining days after approval."""
+)
+def submit_leave_request(name: str, leave_type: str, start_date: str, end_date: str) -> str:
+    """Submit a leave request (demo)"""
+    # Validate required fields
+    missing = [f for f, v in [("name", name), ("leave_type", leave_type), ("start_date", start_date), ("end_date", end_date)] if not v or not str(v).strip()]
+    if missing:
+        return f"Error: missing required fields: {', '.join(missing)}"
+
+    leave_type = leave_type.strip().lower()
+    if leave_type not in ("personal", "sick", "annual"):
+        return "Error: leave_type must be one of: personal / sick / annual"
+
+    # Parse dates to calculate days
+    try:
+        from datetime import datetime
+        start = datetime.strptime(start_date.strip(), "%Y-%m-%d")
+        end = datetime.strptime(end_date.strip(), "%Y-%m-%d")
+        if end < start:
+            return "Error: end_date cannot be before start_date"
+        days = (end - start).days + 1
+    except ValueError:
+        return "Error: invalid date format, use YYYY-MM-DD"
+
+    # Build response
+    remaining = _INITIAL_LEAVE_DAYS - days if leave_type == "annual" else _INITIAL_LEAVE_DAYS
+
+    type_display = {"personal": "Personal Leave", "sick": "Sick Leave", "annual": "Annual Leave"}[leave_type]
+
+    response_lines = [
+        f"Leave request submitted!",
+        f"Employee: {name.strip()}",
+        f"Type: {type_display}",
+        f"Period: {start_date.strip()} to {end_date.strip()}",
+        f"Duration: {days} day(s)",
+        f"Awaiting manager approval...",
+    ]
+
+    if leave_type in ("personal", "sick"):
+        response_lines.append(f"[{type_display} leave does not deduct from annual leave, still have {remaining} days remaining]")
+    else:
+        response_lines.append(f"If approved, remaining annual leave would be: {remaining} days")
+
+    return "\n".join(response_lines)
+
+async def run_mcp():
+    async with api_client.lifespan():
+        try:
+            await mcp.run_async(transport="sse", host="0.0.0.0")
+        finally:
+            report_queue.shutdown(wait=False)
+            await report_delivery.close()
+
+async def run_mcp_banking():
+    await mcp_banking.run_async(transport="sse", port=8001, host="0.0.0.0")
+
+async def run_mcp_hospital():
+    await mcp_hospital.run_async(transport="sse", port=8002, host="0.0.0.0")
+
+# 理财产品查询功能
+@mcp_banking.tool(
+    name="list_financial_products",
+    description="List all available financial products. Returns a formatted list of products with details."
+)
+async def list_financial_products() -> str:
+    """List all available financial products"""
+    products = await async_db.get_financial_products()
+    
+    if not products:
+        return "No financial products available"
+    
+    result = ["Available financial products:"]
+    for i, product in enumerate(products, 1):
+        result.append(
+            f"{i}. {product.name} (ID: {product.id})\n"
+            f"   Description: {product.description}\n"
+            f"   Minimum investment: {product.min_investment} RMB\n"
+            f"   Expected return rate: {product.expected_return_rate * 100:.1f}%\n"
+            f"   Risk level: {product.risk_level}\n"
+            f"   Duration: {product.duration_days} days"
+        )
+    
+    return "\n".join(result)
+
+# 购买理财产品功能
+@mcp_banking.tool(
+    name="purchase_financial_product",
+    description="Purchase a financial product. Args: account_id (account to purchase from), product_id (product ID to purchase), amount (investment amount). Returns purchase result message."
+)
+async def purchase_financial_product(account_id: str, product_id: str, amount: float) -> str:
+    """Purchase financial product
+    
+    Args:
+        account_id: Account ID to purchase from
+        product_id: Financial product ID
+        amount: Investment amount
+    """
+    investment = await async_db.purchase_financial_product(account_id, product_id, amount)
+    
+    if not investment:
+        return "Purchase failed. Please check: 1) Account exists, 2) Product exists, 3) Amount meets minimum requirement, 4) Sufficient balance"
+    
+    return f"Purchase successful! Investment ID: {investment.id}\n" \
+           f"Amount: {amount} RMB\n" \
+           f"Expected maturity date: {investment.expected_maturity_date.strftime('%Y-%m-%d')}\n" \
+           f"Status: {investment.status}"
+
+# 查询用户投资记录功能
+@mcp_banking.tool(
+    name="get_user_investments",
+    description="Get investment records for a specific account. Args: account_id (account to query). Returns formatted investment list with product name, expected return rate and projected payout, or error message."
+)
+async def get_user_investments(account_id: str) -> str:
+    """Get user investment records
+    
+    Args:
+        account_id: Account ID
+    """
+    account = await async_db.get_account(account_id)
+    if not account:
+        return f"Error: Account {account_id} does not exist"
+    
+    investments = await async_db.get_user_investment_details(account_id)
+    
+    if not investments:
+        return f"Account {account_id} has no investment records"
+    
+    result = [f"Investment records for account {account_id} ({account.name}):"]
+    for i, investment in enumerate(investments, 1):
+        lines = [
+            f"{i}. {investment.product_name} (Product ID: {investment.product_id})",
+            f"   Amount: {investment.investment_amount} RMB",
+        ]
+        if investment.expected_return_rate is not None:
+            lines.append(f"   Expected return rate: {investment.expected_return_rate * 100:.1f}%")
+        if investment.projected_payout is not None:
+            lines.append(f"   Projected payout at maturity: {investment.projected_payout} RMB")
+        lines += [
+            f"   Investment date: {investment.investment_date.strftime('%Y-%m-%d')}",
+            f"   Expected maturity date: {investment.expected_maturity_date.strftime('%Y-%m-%d')}",
+            f"   Status: {investment.status}",
+        ]
+        result.append("\n".join(lines))
+    
+    return "\n".join(result)
+
+# Servers addressable by name, used for single-server mode (see supervisor.py)
+SERVERS = {
+    "api": mcp,
+    "banking": mcp_banking,
+    "hospital": mcp_hospital,
+}
+
+async def run_server(name: str, port: int, host: str = "0.0.0.0"):
+    async with api_client.lifespan():
+        try:
+            await SERVERS[name].run_async(transport="sse", port=port, host=host, show_banner=False)
+        finally:
+            report_queue.shutdown(wait=False)
+            await report_delivery.close()
+
+async def main():
+    # Run all services concurrently
+    await asyncio.gather(run_mcp(), run_mcp_banking(), run_mcp_hospital())
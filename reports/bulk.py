@@ -0,0 +1,74 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from reports.delivery import ReportDelivery
+from reports.expense_report import build_expense_report
+from reports.job_queue import JobQueue
+
+ZIP_MIME = "application/zip"
+
+
+def zip_reports(files: List[Tuple[str, bytes]]) -> bytes:
+    """Bundle workbooks into one zip (xlsx is already deflated, so entries are stored)"""
+    buffer = io.BytesIO()
+    seen = set()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as bundle:
+        for filename, content in files:
+            name, n = filename, 1
+            while name in seen:  # two specs may produce the same file name
+                n += 1
+                stem, _, ext = filename.rpartition(".")
+                name = f"{stem}_{n}.{ext}"
+            seen.add(name)
+            bundle.writestr(name, content)
+    return buffer.getvalue()
+
+
+async def run_bulk_reports(queue: JobQueue, delivery: ReportDelivery, specs: List[Dict[str, Any]],
+                           bundle: bool = False) -> Dict[str, Any]:
+    """Build every report across the worker pool, then upload/save them concurrently.
+
+    Returns one entry per spec (in order) with its file_url / output_path or
+    error, plus the optional zip bundle of all successful workbooks.
+    """
+    built = await queue.map(build_expense_report, specs)
+    built = [
+        b if isinstance(b, dict) else {"status": "error", "message": f"Error: {type(b).__name__}: {b}"}
+        for b in built
+    ]
+    files = [(b["filename"], b["content"]) for b in built if b.get("status") == "success"]
+    delivered = await asyncio.gather(*(delivery.deliver(b) for b in built))
+
+    reports = []
+    for index, (spec, result) in enumerate(zip(specs, delivered)):
+        entry = {"index": index, "name": spec["name"], "period": spec["period"], "status": result["status"]}
+        if result["status"] == "success":
+            entry.update(file_url=result["file_url"], output_path=result["output_path"], total=result["total"])
+        else:
+            entry["error"] = result["message"]
+        reports.append(entry)
+
+    succeeded = len(files)
+    lines = [f"Bulk expense reports: {succeeded} succeeded, {len(specs) - succeeded} failed"]
+    for entry in reports:
+        label = f"[{entry['index']}] {entry['name']} {entry['period']}"
+        if entry["status"] != "success":
+            lines.append(f"{label}: {entry['error']}")
+        else:
+            location = entry["file_url"] or entry["output_path"] or "not stored"
+            lines.append(f"{label}: {entry['total']:.2f} RMB -> {location}")
+
+    result = {"status": "success" if succeeded else "error", "reports": reports, "output_path": None}
+    if bundle and files:
+        content = await asyncio.to_thread(zip_reports, files)
+        filename = f"报销表格_bulk_{datetime.now().strftime('%Y%m%d%H%M%S')}.zip"
+        stored = await delivery.store(filename, content, ZIP_MIME)
+        result["bundle"] = {"filename": filename, "file_url": stored["file_url"], "output_path": stored["output_path"]}
+        result["output_path"] = stored["output_path"]
+        lines.append(f"Bundle: {filename}{stored['upload_info']}")
+
+    result["message"] = "\n".join(lines)
+    return result
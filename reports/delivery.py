@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from reports.expense_report import OUTPUT_DIR, XLSX_MIME
+
+
+class ReportUploader:
+    """Uploads generated reports to the file service over one shared, pooled AsyncClient"""
+
+    def __init__(self, upload_url: Optional[str] = None, max_concurrency: int = 8, timeout: float = 30.0):
+        self.upload_url = upload_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.upload_url)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def upload(self, filename: str, content: bytes, content_type: str = XLSX_MIME) -> str:
+        """POST the file straight from memory; returns the download URL"""
+        client = self._get_client()
+        async with self._slots:
+            response = await client.post(
+                self.upload_url,
+                files={"file": (filename, content, content_type)},
+                data={"filePath": "agent_source", "rename": "false"},
+            )
+        resp_json = response.json()
+        if resp_json.get("code") == "000000" and resp_json.get("data"):
+            return resp_json["data"][0].get("url", "")
+        raise Exception(f"Server returned: {resp_json.get('msg', 'unknown error')}")
+
+    async def close(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+class ReportStorage:
+    """Optional on-disk copies of generated reports, with unique names and age-based cleanup"""
+
+    def __init__(self, output_dir: str = OUTPUT_DIR, retention_hours: float = 24.0):
+        self.output_dir = output_dir
+        self.retention_seconds = retention_hours * 3600
+
+    def unique_path(self, filename: str) -> str:
+        stem, ext = os.path.splitext(filename)
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        return os.path.join(self.output_dir, f"{stem}_{stamp}_{uuid.uuid4().hex[:8]}{ext}")
+
+    def save(self, filename: str, content: bytes) -> str:
+        """Write atomically under a unique name, then drop files past the retention period"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self.unique_path(filename)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self.cleanup()
+        return path
+
+    def cleanup(self) -> int:
+        """Delete reports older than the retention period; returns how many were removed"""
+        if self.retention_seconds <= 0 or not os.path.isdir(self.output_dir):
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for entry in os.scandir(self.output_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+class ReportDelivery:
+    """Uploads a built report and/or keeps it on disk, according to ``persist``.
+
+    persist: "never" (memory only), "on_failure" (disk only when there is no
+    upload URL or the upload fails) or "always".
+    """
+
+    PERSIST_MODES = ("never", "on_failure", "always")
+
+    def __init__(self, uploader: ReportUploader, storage: ReportStorage, persist: str = "on_failure"):
+        if persist not in self.PERSIST_MODES:
+            raise ValueError(f"persist must be one of {', '.join(self.PERSIST_MODES)}, got {persist!r}")
+        self.uploader = uploader
+        self.storage = storage
+        self.persist = persist
+
+    async def deliver(self, built: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a build_expense_report() result into the job's final result"""
+        if built.get("status") != "success":
+            return built
+        result = {key: value for key, value in built.items() if key != "content"}
+        stored = await self.store(built["filename"], built["content"])
+        result.update(file_url=stored["file_url"], output_path=stored["output_path"])
+        result["message"] = (
+            f"Expense report filled successfully!\n"
+            f"{built.get('summary', '')}"
+            f"{stored['upload_info']}"
+        )
+        return result
+
+    async def store(self, filename: str, content: bytes, content_type: str = XLSX_MIME) -> Dict[str, Any]:
+        """Upload ``content`` and/or save it to disk; returns file_url, output_path and upload_info"""
+        stored = {"file_url": None, "output_path": None, "upload_info": ""}
+        uploaded = False
+        if self.uploader.enabled:
+            try:
+                stored["file_url"] = await self.uploader.upload(filename, content, content_type)
+                uploaded = True
+                print(f"[Upload success] {filename} -> {stored['file_url']}")
+                stored["upload_info"] = f"\nFile uploaded to server\nDownload URL: {stored['file_url']}"
+            except Exception as e:
+                print(f"[Upload failed] {filename} -> {str(e)}")
+                stored["upload_info"] = f"\nUpload failed: {str(e)}"
+
+        if self.persist == "always" or (self.persist == "on_failure" and not uploaded):
+            try:
+                stored["output_path"] = await asyncio.to_thread(self.storage.save, filename, content)
+            except OSError as e:
+                stored["upload_info"] += f"\nCannot save output file — {str(e)}"
+        return stored
+
+    async def close(self):
+        await self.uploader.close()
+
+
+def delivery_from_env() -> ReportDelivery:
+    """UPLOAD_API_URL, EXPENSE_REPORT_PERSIST and EXPENSE_REPORT_RETENTION_HOURS"""
+    return ReportDelivery(
+        ReportUploader(
+            os.getenv("UPLOAD_API_URL"),
+            max_concurrency=int(os.getenv("EXPENSE_REPORT_UPLOAD_CONCURRENCY", "8")),
+        ),
+        ReportStorage(retention_hours=float(os.getenv("EXPENSE_REPORT_RETENTION_HOURS", "24"))),
+        persist=os.getenv("EXPENSE_REPORT_PERSIST", "on_failure"),
+    )
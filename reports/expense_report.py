@@ -0,0 +1,229 @@
+import copy
+import io
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from reports.template_cache import TemplateCache
+from schemas.expense_models import LOCAL_CATEGORIES, OVERSEAS_CATEGORIES
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(BASE_DIR, "template", "报销表格_202501.xlsx")
+OUTPUT_DIR = os.path.join(BASE_DIR, "template", "output")
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+CARRIED_FORWARD_LABEL = "承上页"
+
+# One parsed template per worker process
+template_cache = TemplateCache(TEMPLATE_PATH)
+
+
+class SheetLayout(NamedTuple):
+    """Where things live on one template sheet"""
+    sheet_name: str
+    categories: List[str]
+    first_row: int
+    rows_per_sheet: int
+    # Column holding the RMB amount the category formulas read (overseas converts D -> E)
+    rmb_column: str
+    # Category column letter -> category name, in header order
+    category_columns: Dict[str, str]
+
+
+LAYOUTS = {
+    "local": SheetLayout(
+        "报销表格_本地", LOCAL_CATEGORIES, first_row=9, rows_per_sheet=30, rmb_column="D",  # rows 9–38
+        category_columns=dict(zip("FGHIJKL", LOCAL_CATEGORIES)),
+    ),
+    "overseas": SheetLayout(
+        # rows 9–42 (row 43 starts local-currency section)
+        "报销表格_海外", OVERSEAS_CATEGORIES, first_row=9, rows_per_sheet=34, rmb_column="E",
+        category_columns=dict(zip("GHIJKL", OVERSEAS_CATEGORIES)),
+    ),
+}
+
+
+class ItemSummary(NamedTuple):
+    rows: List[Tuple[Any, Any, str, float]]
+    subtotals: Dict[str, float]
+    total: float
+    total_original: float
+    errors: List[str]
+
+
+def warm_template_cache():
+    """Worker initializer: parse the template before the first report arrives"""
+    try:
+        template_cache.warm()
+    except Exception as e:
+        print(f"[Expense report] Cannot preload template: {str(e)}")
+
+
+def summarize_items(expense_items: List[Dict[str, Any]], sheet_type: str, exchange_rate: float = 1.0) -> ItemSummary:
+    """Validate, normalize and aggregate the items in a single pass.
+
+    Subtotals are per-category RMB amounts computed in Python (overseas amounts
+    are converted per item like the template's ROUND(D*rate, 2)), so they do
+    not depend on Excel recalculating the workbook's formulas.
+    """
+    rate = exchange_rate if sheet_type == "overseas" else 1.0
+    subtotals = dict.fromkeys(LAYOUTS[sheet_type].categories, 0.0)
+    rows, errors = [], []
+    total = total_original = 0.0
+    for i, item in enumerate(expense_items, start=1):
+        if not isinstance(item, dict):
+            errors.append(f"item {i}: must be an object")
+            continue
+        try:
+            amount = float(item.get("amount", 0) or 0)
+        except (TypeError, ValueError):
+            errors.append(f"item {i}: amount must be a number, got {item.get('amount')!r}")
+            continue
+        category = str(item.get("category", "") or "")
+        rmb = round(amount * rate, 2)
+        subtotals[category] = subtotals.get(category, 0.0) + rmb
+        total += rmb
+        total_original += amount
+        rows.append((item.get("date", ""), item.get("details", ""), category, amount))
+    return ItemSummary(
+        rows,
+        {category: round(amount, 2) for category, amount in subtotals.items()},
+        round(total, 2),
+        round(total_original, 2),
+        errors,
+    )
+
+
+def _header_texts(ws, layout: SheetLayout) -> Dict[str, str]:
+    """Category name -> exact header text; the formulas compare C to the header, some of which contain line breaks"""
+    texts = {}
+    for column, category in layout.category_columns.items():
+        header = ws[f"{column}{layout.first_row - 1}"].value
+        texts[category] = header if isinstance(header, str) else category
+    return texts
+
+
+def _clone_sheet(wb, template_ws, page: int):
+    ws = wb.copy_worksheet(template_ws)
+    ws.title = f"{template_ws.title} ({page})"
+    # copy_worksheet does not carry data validations (the category drop-down)
+    for validation in template_ws.data_validations.dataValidation:
+        ws.add_data_validation(copy.copy(validation))
+    return ws
+
+
+def _fill_header(ws, sheet_type: str, spec: Dict[str, Any]):
+    if sheet_type == "local":
+        ws["B5"] = spec["name"]
+        ws["B6"] = spec["period"]
+    else:
+        ws["B4"] = spec["name"]
+        ws["B5"] = spec["period"]
+        ws["B6"] = spec.get("project_name", "")
+        ws["L6"] = spec.get("original_currency", "USD")
+        ws["L7"] = spec.get("exchange_rate", 7.2)
+
+
+def _write_carried_forward(ws, layout: SheetLayout, row: int, carried: Dict[str, float],
+                           carried_rmb: float, carried_original: float, page: int):
+    """First row of a continuation sheet: totals brought forward from the previous sheets"""
+    ws[f"A{row}"] = CARRIED_FORWARD_LABEL
+    ws[f"B{row}"] = f"第 1–{page - 1} 页合计"
+    ws[f"D{row}"] = round(carried_original, 2)
+    if layout.rmb_column != "D":
+        ws[f"{layout.rmb_column}{row}"] = round(carried_rmb, 2)
+    for column, category in layout.category_columns.items():
+        ws[f"{column}{row}"] = round(carried.get(category, 0.0), 2)
+
+
+def build_expense_report(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill clones of the expense template and serialize the workbook to xlsx bytes in memory.
+
+    Items beyond one sheet's capacity continue on copies of the template sheet.
+    Each continuation sheet starts with a carried-forward row, so its totals
+    row is cumulative and the last sheet shows the grand total. CPU-bound
+    openpyxl work, so it runs in a worker process of the report job queue;
+    uploading or saving the bytes is left to ``reports.delivery`` in the server
+    process. ``spec`` holds the tool arguments with ``items`` parsed into a list.
+    """
+    name = spec["name"]
+    period = spec["period"]
+    sheet_type = spec.get("sheet_type", "local")
+    layout = LAYOUTS[sheet_type]
+    rate = spec.get("exchange_rate", 7.2)
+
+    summary = summarize_items(spec["items"], sheet_type, rate)
+    if summary.errors:
+        return {"status": "error", "message": "Error: invalid expense items — " + "; ".join(summary.errors)}
+
+    try:
+        wb = template_cache.get()
+    except Exception as e:
+        return {"status": "error", "message": f"Error: Cannot load template file — {str(e)}"}
+
+    template_ws = wb[layout.sheet_name]
+    header_texts = _header_texts(template_ws, layout)
+    rows = summary.rows
+    # Page 1 holds rows_per_sheet items; later pages give one row to the carried-forward line
+    overflow = max(0, len(rows) - layout.rows_per_sheet)
+    continuation_pages = -(-overflow // (layout.rows_per_sheet - 1))
+    # Clone the pristine sheet before anything is written to it
+    sheets = [template_ws] + [_clone_sheet(wb, template_ws, page) for page in range(2, continuation_pages + 2)]
+
+    carried = dict.fromkeys(layout.categories, 0.0)
+    carried_rmb = carried_original = 0.0
+    position = 0
+    for page, ws in enumerate(sheets, start=1):
+        _fill_header(ws, sheet_type, spec)
+        row = layout.first_row
+        capacity = layout.rows_per_sheet
+        if page > 1:
+            _write_carried_forward(ws, layout, row, carried, carried_rmb, carried_original, page)
+            row += 1
+            capacity -= 1
+        for date, details, category, amount in rows[position:position + capacity]:
+            ws[f"A{row}"] = date
+            ws[f"B{row}"] = details
+            ws[f"C{row}"] = header_texts.get(category, category)
+            ws[f"D{row}"] = amount
+            # Overseas column E (RMB amount) is auto-calculated by the existing formula =ROUND(D*$L$7,2)
+            rmb = round(amount * rate, 2) if sheet_type == "overseas" else amount
+            carried[category] = carried.get(category, 0.0) + rmb
+            carried_rmb += rmb
+            carried_original += amount
+            row += 1
+        position += capacity
+
+    output_filename = spec.get("output_filename")
+    if not output_filename:
+        safe_period = period.replace("/", "-").replace(" ", "_")
+        output_filename = f"报销表格_{name}_{safe_period}_{sheet_type}"
+
+    buffer = io.BytesIO()
+    try:
+        wb.save(buffer)
+    except Exception as e:
+        return {"status": "error", "message": f"Error: Cannot save output file — {str(e)}"}
+
+    return {
+        "status": "success",
+        "rows_filled": len(rows),
+        "sheets": len(sheets),
+        "subtotals": summary.subtotals,
+        "total": summary.total,
+        "summary": format_summary(summary, len(sheets), sheet_type, spec.get("original_currency")),
+        "filename": f"{output_filename}.xlsx",
+        "content": buffer.getvalue(),
+    }
+
+
+def format_summary(summary: ItemSummary, sheets: int, sheet_type: str, currency: Optional[str] = None) -> str:
+    lines = [f"Items: {len(summary.rows)} on {sheets} sheet(s)"]
+    for category, amount in summary.subtotals.items():
+        if amount:
+            lines.append(f"  {category}: {amount:.2f} RMB")
+    if sheet_type == "overseas":
+        lines.append(f"Total: {summary.total:.2f} RMB ({summary.total_original:.2f} {currency or 'original currency'})")
+    else:
+        lines.append(f"Total: {summary.total:.2f} RMB")
+    return "\n".join(lines)
@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class QueueFullError(Exception):
+    """Raised by ``JobQueue.submit`` when the backlog limit has been reached"""
+
+
+class Job:
+    """One queued unit of work and its outcome"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    __slots__ = ("id", "status", "submitted_at", "started_at", "finished_at", "result", "error", "task", "weight")
+
+    def __init__(self, weight: int = 1):
+        self.id = uuid.uuid4().hex
+        self.weight = weight  # work items counted against the queue's admission limit
+        self.status = self.QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Async job queue in front of a process pool.
+
+    ``submit`` returns immediately with a Job whose id can be polled; at most
+    ``max_workers`` jobs run at once and at most ``max_pending`` more wait,
+    beyond which submissions are rejected with QueueFullError. A job that fans
+    out over several items counts as that many jobs. Finished jobs are kept
+    for ``retention`` seconds.
+
+    Workers use the ``spawn`` start method so they never inherit the server's
+    threads (database executors, event loop) mid-operation. Spawned workers
+    re-import the launching script as ``__mp_main__``, so that script must be
+    free of import side effects (see mcp_server.py); job functions belong in
+    modules such as reports.expense_report.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 32, retention: float = 3600.0,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.retention = retention
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, Job] = {}
+        self.submitted = 0
+        self.rejected = 0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self._initializer,
+                initargs=self._initargs,
+            )
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    def backlog(self) -> int:
+        return sum(job.weight for job in self._jobs.values() if not job.finished)
+
+    def _admit(self, weight: int = 1):
+        self._purge()
+        if weight > self.capacity():
+            self.rejected += 1
+            raise QueueFullError(
+                f"Job of {weight} items exceeds the queue capacity of {self.capacity()}, submit it in smaller batches"
+            )
+        if self.backlog() + weight > self.capacity():
+            self.rejected += 1
+            raise QueueFullError(
+                f"Job queue is full ({self.max_workers} running, {self.max_pending} waiting), please retry later"
+            )
+        self._ensure_started()
+
+    def submit(self, fn: Callable, *args, finalize: Optional[Callable[[Any], Awaitable[Any]]] = None) -> Job:
+        """Queue ``fn(*args)`` (picklable, module-level) and return its Job right away.
+
+        ``finalize``, if given, is awaited in this process with the worker's
+        return value (after the worker slot is released) and its result becomes
+        the job result; use it for I/O such as uploads.
+        """
+        self._admit()
+        job = Job()
+        self._jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job, fn, args, finalize))
+        self.submitted += 1
+        return job
+
+    def submit_task(self, factory: Callable[[], Awaitable[Any]], weight: int = 1) -> Job:
+        """Queue a coroutine (e.g. one that fans out via ``map``) as a single job.
+
+        ``weight`` is the number of items it will ``map`` over; the job is
+        admitted only if that many fit in the queue.
+        """
+        self._admit(weight)
+        job = Job(weight)
+        self._jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run_task(job, factory))
+        self.submitted += 1
+        return job
+
+    async def map(self, fn: Callable, items: List[Any]) -> List[Any]:
+        """Run ``fn(item)`` for every item across the pool, sharing the worker slots with other jobs.
+
+        Results keep the input order; an exception is returned in place of the
+        result for the item that raised it.
+        """
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+
+        async def one(item):
+            async with self._slots:
+                return await loop.run_in_executor(self._executor, fn, item)
+
+        return await asyncio.gather(*(one(item) for item in items), return_exceptions=True)
+
+    async def _run_task(self, job: Job, factory):
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await factory()
+            job.status = Job.DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = Job.FAILED
+        finally:
+            job.finished_at = time.time()
+            job.task = None
+
+    async def _run(self, job: Job, fn: Callable, args: tuple, finalize):
+        try:
+            async with self._slots:
+                job.status = Job.RUNNING
+                job.started_at = time.time()
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            if finalize is not None:
+                result = await finalize(result)
+            job.result = result
+            job.status = Job.DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = Job.FAILED
+        finally:
+            job.finished_at = time.time()
+            job.task = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Optional[Job]:
+        """Wait for a job to finish (used by tests and bulk callers)"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.task is not None:
+            await asyncio.shield(job.task)
+        return job
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        counts = {Job.QUEUED: 0, Job.RUNNING: 0, Job.DONE: 0, Job.FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            **counts,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,55 @@
+import os
+import pickle
+import threading
+from typing import Dict, Optional
+
+import openpyxl
+from openpyxl.workbook.workbook import Workbook
+
+
+class TemplateCache:
+    """Keeps a parsed workbook template in memory and hands out independent clones.
+
+    The template is parsed with ``openpyxl.load_workbook`` once and the pristine
+    master is held as a pickle; ``get()`` unpickles a fresh copy, which is
+    cheaper than re-reading the zip and re-parsing every sheet's XML. The master
+    is reloaded when the file's mtime changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._master: Optional[bytes] = None
+        self._mtime: Optional[int] = None
+        self.loads = 0
+        self.clones = 0
+
+    def _load(self, mtime: int):
+        workbook = openpyxl.load_workbook(self.path)
+        self._master = pickle.dumps(workbook, protocol=pickle.HIGHEST_PROTOCOL)
+        self._mtime = mtime
+        self.loads += 1
+
+    def get(self) -> Workbook:
+        """A private, mutable copy of the current template"""
+        mtime = os.stat(self.path).st_mtime_ns
+        with self._lock:
+            if self._master is None or mtime != self._mtime:
+                self._load(mtime)
+            master = self._master
+            self.clones += 1
+        return pickle.loads(master)
+
+    def warm(self):
+        """Parse the template ahead of the first request (e.g. in a worker initializer)"""
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            if self._master is None or mtime != self._mtime:
+                self._load(mtime)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "loads": self.loads,
+            "clones": self.clones,
+            "master_bytes": len(self._master) if self._master else 0,
+        }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -14,6 +14,31 @@ class Transaction(BaseModel):
     id: str
     from_account: str
     to_account: str
-    amount: float
+    amount: float = Field(gt=0, allow_inf_nan=False)
     timestamp: datetime
-    description: Optional[str] = None
\ No newline at end of file
+    description: Optional[str] = None
+
+class TransferReceipt(BaseModel):
+    """Result of an atomic transfer; account balances are post-transfer"""
+    transaction: Transaction
+    from_account: Account
+    to_account: Account
+
+
+class TransferRequest(BaseModel):
+    """One transfer inside a batch_transfer call"""
+    from_account_id: str
+    to_account_id: str
+    amount: float = Field(gt=0, allow_inf_nan=False)
+    description: Optional[str] = None
+
+
+class BatchTransferResult(BaseModel):
+    """Per-item outcome of a batch transfer"""
+    index: int
+    from_account: str
+    to_account: str
+    amount: float
+    status: str  # success / failed / rolled_back
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
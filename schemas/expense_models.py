@@ -0,0 +1,151 @@
+from pydantic import BeforeValidator, ConfigDict, Field, TypeAdapter, ValidationError, with_config
+from typing import Annotated, Any, Dict, List, Tuple, Union
+from typing_extensions import NotRequired, TypedDict
+
+try:
+    import orjson  # optional, faster decoding of large item lists
+except ImportError:
+    orjson = None
+
+
+LOCAL_CATEGORIES = ["餐食", "交通", "娱乐", "医疗费", "通讯费", "电子相关", "其它费用"]
+OVERSEAS_CATEGORIES = ["旅费报销(机票)", "旅费报销(住宿费)", "旅费报销(车费)", "旅费报销(餐费)", "其它费用", "通讯费"]
+
+# English names accepted by the tools (lower-case) -> template category
+LOCAL_CATEGORY_ALIASES = {
+    "meals": "餐食",
+    "transportation": "交通",
+    "entertainment": "娱乐",
+    "medical": "医疗费",
+    "communication": "通讯费",
+    "electronics": "电子相关",
+    "other": "其它费用",
+}
+OVERSEAS_CATEGORY_ALIASES = {
+    "flight": "旅费报销(机票)",
+    "accommodation": "旅费报销(住宿费)",
+    "ground transport": "旅费报销(车费)",
+    "meals": "旅费报销(餐费)",
+    "other": "其它费用",
+    "communication": "通讯费",
+}
+
+# Longest error list returned to the caller; the rest are counted
+MAX_REPORTED_ERRORS = 20
+
+# Below this size pydantic-core's fused parse+validate wins; above it orjson decoding is cheaper
+# (see benchmarks/bench_expense_items.py)
+ORJSON_MIN_BYTES = 64 * 1024
+
+
+def _category_validator(categories: List[str], aliases: Dict[str, str]):
+    """Before-validator mapping a category (template name or English alias, any case) to the template name"""
+    lookup = {category: category for category in categories}
+    lookup.update(aliases)
+    expected = ", ".join(lookup)
+
+    def normalize_category(value: Any) -> str:
+        if not isinstance(value, str):
+            raise ValueError("category must be a string")
+        key = value.strip()
+        category = lookup.get(key) or lookup.get(key.lower())
+        if category is None:
+            raise ValueError(f"unknown category {value!r}; expected one of: {expected}")
+        return category
+
+    return BeforeValidator(normalize_category)
+
+
+# TypedDicts validate straight into plain dicts (no model instances to dump),
+# which keeps 10k-item reports cheap and picklable for the report workers.
+@with_config(ConfigDict(extra="ignore", str_strip_whitespace=True))
+class LocalExpenseItem(TypedDict):
+    """Local (RMB) expense line; category is one of LOCAL_CATEGORIES or its English alias"""
+    date: NotRequired[str]
+    details: NotRequired[str]
+    category: Annotated[str, _category_validator(LOCAL_CATEGORIES, LOCAL_CATEGORY_ALIASES)]
+    amount: Annotated[float, Field(allow_inf_nan=False)]
+
+
+@with_config(ConfigDict(extra="ignore", str_strip_whitespace=True))
+class OverseasExpenseItem(TypedDict):
+    """Overseas expense line in the original currency; category is one of OVERSEAS_CATEGORIES or its English alias"""
+    date: NotRequired[str]
+    details: NotRequired[str]
+    category: Annotated[str, _category_validator(OVERSEAS_CATEGORIES, OVERSEAS_CATEGORY_ALIASES)]
+    amount: Annotated[float, Field(allow_inf_nan=False)]
+
+
+# Compiled once: validate_json parses and validates in a single pass inside pydantic-core
+EXPENSE_ITEMS_ADAPTERS = {
+    "local": TypeAdapter(List[LocalExpenseItem]),
+    "overseas": TypeAdapter(List[OverseasExpenseItem]),
+}
+
+
+@with_config(ConfigDict(extra="ignore", str_strip_whitespace=True))
+class ExpenseReportSpec(TypedDict):
+    """One fill_expense_reports_bulk entry: the fill_expense_report arguments; items are validated separately"""
+    name: str
+    period: str
+    items: Union[str, List[Any]]
+    sheet_type: NotRequired[str]
+    project_name: NotRequired[str]
+    original_currency: NotRequired[str]
+    exchange_rate: NotRequired[Annotated[float, Field(allow_inf_nan=False)]]
+    output_filename: NotRequired[str]
+
+
+# Coerces what the tool signature would for a single report, e.g. exchange_rate "7.2" -> 7.2
+EXPENSE_REPORT_SPEC_ADAPTER = TypeAdapter(ExpenseReportSpec)
+
+
+def _format_errors(error: ValidationError) -> List[str]:
+    errors = error.errors(include_url=False)
+    messages = []
+    for detail in errors[:MAX_REPORTED_ERRORS]:
+        loc = detail["loc"]
+        if not loc:
+            if detail["type"] == "json_invalid":
+                messages.append(f"Invalid items JSON — {detail['ctx'].get('error', detail['msg'])}")
+            else:
+                messages.append("items must be a JSON array")
+            continue
+        field = ".".join(str(part) for part in loc[1:]) or "item"
+        message = detail["msg"].removeprefix("Value error, ")
+        messages.append(f"item {loc[0] + 1} ({field}): {message}")
+    if len(errors) > MAX_REPORTED_ERRORS:
+        messages.append(f"... and {len(errors) - MAX_REPORTED_ERRORS} more errors")
+    return messages
+
+
+def validate_expense_items(items: Union[str, bytes, List[Any]], sheet_type: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parse (if JSON) and validate every item in one pass.
+
+    Returns (items as plain dicts with template category names, []) or
+    ([], per-item error messages).
+    """
+    adapter = EXPENSE_ITEMS_ADAPTERS[sheet_type]
+    try:
+        if isinstance(items, (str, bytes)):
+            if orjson is not None and len(items) >= ORJSON_MIN_BYTES:
+                try:
+                    items = orjson.loads(items)
+                except orjson.JSONDecodeError as e:
+                    return [], [f"Invalid items JSON — {str(e)}"]
+            else:
+                return adapter.validate_json(items), []
+        return adapter.validate_python(items), []
+    except ValidationError as e:
+        return [], _format_errors(e)
+
+
+def validate_report_spec(spec: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """Validate one bulk report spec's fields; returns (spec with coerced values, []) or ({}, error messages)"""
+    try:
+        return EXPENSE_REPORT_SPEC_ADAPTER.validate_python(spec), []
+    except ValidationError as e:
+        return {}, [
+            f"{'.'.join(str(part) for part in detail['loc']) or 'report'}: {detail['msg']}"
+            for detail in e.errors(include_url=False)[:MAX_REPORTED_ERRORS]
+        ]
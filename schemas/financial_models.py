@@ -24,3 +24,11 @@ class UserInvestment(BaseModel):
     investment_date: datetime
     expected_maturity_date: datetime
     status: str  # 持有中、已到期、已赎回
+
+
+class InvestmentDetail(UserInvestment):
+    """带产品信息的投资记录视图（user_investments JOIN financial_products）"""
+    product_name: str
+    expected_return_rate: Optional[float] = None  # 年化收益率
+    duration_days: Optional[int] = None
+    projected_payout: Optional[float] = None  # 到期预计本息合计
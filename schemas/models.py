@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any, Tuple
 
 
 class APIParameter(BaseModel):
@@ -20,6 +20,63 @@ class APIEndpoint(BaseModel):
     tool_name: str
     headers: Optional[Dict[str, str]] = None
     parameters: Optional[List[APIParameter]] = None
+    # Fixed request fields sent on every call; caller parameters take precedence
+    static_params: Optional[Dict[str, Any]] = None
+    # Seconds to cache GET responses per (tool, params); None disables caching
+    cache_ttl: Optional[float] = None
+    # "sse" or "ndjson": consume the response as a stream and forward chunks as progress
+    stream_format: Optional[str] = None
+
+
+class HTTPClientConfig(BaseModel):
+    """Connection Pool Configuration Model (one pool per API)"""
+    max_connections: int = Field(default=100, ge=1)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 5.0
+    # Upper bound on in-flight requests to this API; None means max_connections
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class RetryPolicy(BaseModel):
+    """Retry Policy Model (idempotent methods only)"""
+    max_attempts: int = Field(default=3, ge=1)
+    backoff_base: float = Field(default=0.2, ge=0)
+    backoff_max: float = Field(default=5.0, ge=0)
+    # HTTP methods that are safe to send more than once
+    methods: List[str] = Field(default_factory=lambda: ["GET"])
+    retry_on_status: List[int] = Field(default_factory=lambda: [429, 502, 503, 504])
+
+
+class HedgePolicy(BaseModel):
+    """Hedged Request Policy Model (idempotent methods only)"""
+    enabled: bool = False
+    # Send a second request once the first has been outstanding longer than this latency percentile
+    percentile: float = Field(default=95.0, gt=0, lt=100)
+    min_samples: int = Field(default=20, ge=1)
+    window: int = Field(default=200, ge=1)
+
+
+class CircuitBreakerPolicy(BaseModel):
+    """Circuit Breaker Policy Model"""
+    enabled: bool = True
+    failure_threshold: int = Field(default=5, ge=1)
+    # Seconds the circuit stays open before half-open probing
+    reset_timeout: float = Field(default=30.0, gt=0)
+    half_open_max_calls: int = Field(default=1, ge=1)
+
+
+class ResiliencePolicy(BaseModel):
+    """Per-API Resilience Policy Model"""
+    # Overall time budget for one call including retries and backoff; None means no deadline
+    deadline: Optional[float] = Field(default=None, gt=0)
+    retry: RetryPolicy = Field(default_factory=RetryPolicy)
+    hedge: HedgePolicy = Field(default_factory=HedgePolicy)
+    circuit_breaker: CircuitBreakerPolicy = Field(default_factory=CircuitBreakerPolicy)
 
 
 class APIConfig(BaseModel):
@@ -27,15 +84,55 @@ class APIConfig(BaseModel):
     name: str
     base_url: str
     headers: Optional[Dict[str, str]] = None
+    http: HTTPClientConfig = Field(default_factory=HTTPClientConfig)
+    resilience: ResiliencePolicy = Field(default_factory=ResiliencePolicy)
     endpoints: List[APIEndpoint]
 
 
+class RequestPlan(BaseModel):
+    """Precompiled, immutable request plan for one configured tool"""
+    model_config = ConfigDict(frozen=True)
+
+    tool_name: str
+    api_name: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    static_params: Dict[str, Any]
+    parameters: Tuple[APIParameter, ...]
+    description: str
+    cache_ttl: Optional[float] = None
+    stream_format: Optional[str] = None
+
+
+class ServerProcessConfig(BaseModel):
+    """Per-server Process Configuration Model (used by the supervisor)"""
+    port: int
+    workers: int = Field(default=1, ge=1)
+
+
+def _default_processes() -> Dict[str, ServerProcessConfig]:
+    return {
+        "api": ServerProcessConfig(port=8000),
+        "banking": ServerProcessConfig(port=8001),
+        "hospital": ServerProcessConfig(port=8002),
+    }
+
+
 class ServerConfig(BaseModel):
     """Server Configuration Model"""
     name: str
     version: str
     description: str
     port: int
+    host: str = "0.0.0.0"
+    # Worker i of a server listens on port + i * worker_port_stride
+    worker_port_stride: int = Field(default=100, ge=1)
+    health_check_interval: float = 5.0
+    health_check_timeout: float = 2.0
+    health_check_failures: int = 3
+    startup_grace_period: float = 15.0
+    processes: Dict[str, ServerProcessConfig] = Field(default_factory=_default_processes)
 
 
 class ConfigModel(BaseModel):
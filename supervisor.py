@@ -0,0 +1,190 @@
+"""Multi-process supervisor for the MCP servers.
+
+Launches every server listed under ``server.processes`` in
+config/api_config.yaml as ``workers`` separate processes, assigns each worker
+its own port, health-checks them over HTTP and restarts crashed or hung
+workers with exponential backoff.
+
+    python supervisor.py [--config config/api_config.yaml]
+
+Worker ``i`` of a server listens on ``port + i * worker_port_stride``; SSE
+sessions are held in worker memory, so a load balancer in front of several
+workers must keep each client on the same worker (sticky sessions).
+"""
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List
+
+from schemas.models import ServerConfig
+from utils.config_loader import ConfigLoader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_SCRIPT = os.path.join(BASE_DIR, "mcp_server.py")
+
+_MAX_BACKOFF = 30.0
+
+
+class Worker:
+    """One server process managed by the supervisor"""
+
+    def __init__(self, server: str, index: int, port: int):
+        self.server = server
+        self.index = index
+        self.port = port
+        self.process: subprocess.Popen = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.health_failures = 0
+        self.next_start_at = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.server}#{self.index}:{self.port}"
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class Supervisor:
+    def __init__(self, config: ServerConfig):
+        self.config = config
+        self.workers = self._plan_workers()
+        self._stopping = False
+
+    def _plan_workers(self) -> List[Worker]:
+        workers = []
+        for server, process_config in self.config.processes.items():
+            for index in range(process_config.workers):
+                port = process_config.port + index * self.config.worker_port_stride
+                workers.append(Worker(server, index, port))
+
+        ports = [w.port for w in workers]
+        duplicates = sorted({p for p in ports if ports.count(p) > 1})
+        if duplicates:
+            raise ValueError(
+                f"Port collision between workers on {duplicates}; "
+                "increase server.worker_port_stride or change the server ports"
+            )
+        return workers
+
+    # ── Process management ────────────────────────────────────────────────────
+
+    def start(self, worker: Worker):
+        worker.process = subprocess.Popen(
+            [
+                sys.executable, SERVER_SCRIPT,
+                "--server", worker.server,
+                "--port", str(worker.port),
+                "--host", self.config.host,
+            ],
+            cwd=BASE_DIR,
+        )
+        worker.started_at = time.monotonic()
+        worker.health_failures = 0
+        print(f"[supervisor] started {worker.label} (pid {worker.process.pid})")
+
+    def stop(self, worker: Worker, timeout: float = 10.0):
+        if not worker.is_running():
+            return
+        worker.process.terminate()
+        try:
+            worker.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+            worker.process.wait()
+
+    def schedule_restart(self, worker: Worker, reason: str):
+        backoff = min(_MAX_BACKOFF, 2 ** min(worker.restarts, 5))
+        # A worker that stayed up for a while gets a fresh backoff budget
+        if time.monotonic() - worker.started_at > _MAX_BACKOFF * 2:
+            backoff = 1.0
+            worker.restarts = 0
+        worker.restarts += 1
+        worker.next_start_at = time.monotonic() + backoff
+        worker.process = None
+        print(f"[supervisor] {worker.label} {reason}; restarting in {backoff:.0f}s")
+
+    # ── Health checks ─────────────────────────────────────────────────────────
+
+    def is_healthy(self, worker: Worker) -> bool:
+        """Any HTTP response proves the worker's event loop is serving requests"""
+        conn = http.client.HTTPConnection("127.0.0.1", worker.port, timeout=self.config.health_check_timeout)
+        try:
+            conn.request("GET", "/messages/")
+            conn.getresponse().read()
+            return True
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+    def check(self, worker: Worker):
+        now = time.monotonic()
+        if worker.process is None:
+            if now >= worker.next_start_at:
+                self.start(worker)
+            return
+
+        exit_code = worker.process.poll()
+        if exit_code is not None:
+            self.schedule_restart(worker, f"exited with code {exit_code}")
+            return
+
+        if now - worker.started_at < self.config.startup_grace_period:
+            return
+        if self.is_healthy(worker):
+            worker.health_failures = 0
+            return
+        worker.health_failures += 1
+        if worker.health_failures >= self.config.health_check_failures:
+            self.stop(worker)
+            self.schedule_restart(worker, f"failed {worker.health_failures} health checks")
+
+    # ── Main loop ─────────────────────────────────────────────────────────────
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        for worker in self.workers:
+            self.start(worker)
+        try:
+            while not self._stopping:
+                for worker in self.workers:
+                    self.check(worker)
+                self._sleep(self.config.health_check_interval)
+        finally:
+            self.shutdown()
+
+    def _sleep(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < deadline:
+            time.sleep(min(0.2, deadline - time.monotonic()))
+
+    def _handle_signal(self, signum, frame):
+        self._stopping = True
+
+    def shutdown(self):
+        print("[supervisor] stopping workers...")
+        for worker in self.workers:
+            if worker.is_running():
+                worker.process.terminate()
+        for worker in self.workers:
+            self.stop(worker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run each MCP server as supervised worker processes")
+    parser.add_argument("--config", default=os.path.join(BASE_DIR, "config", "api_config.yaml"))
+    args = parser.parse_args()
+
+    server_config = ConfigLoader(args.config).load_config().server
+    Supervisor(server_config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Transfers inside a caller's transaction must not commit or discard the caller's work.
+
+Run with: python -m pytest -q test_bank_transfers.py
+"""
+import pytest
+
+from db.database import Database, TransferError
+from schemas.bank_models import TransferRequest
+
+
+@pytest.fixture
+def bank(tmp_path):
+    database = Database(str(tmp_path / "bank.sqlite3"))
+    yield database
+    database.close()
+
+
+def balances(bank):
+    with bank.get_connection() as conn:
+        return dict(conn.execute("SELECT id, balance FROM accounts"))
+
+
+def test_transfer_commits_on_its_own(bank):
+    bank.transfer("1001", "1002", 50.0)
+    assert balances(bank)["1001"] == 950.0
+    assert balances(bank)["1002"] == 2050.0
+
+
+def test_nested_transfer_leaves_commit_to_the_caller(bank):
+    with pytest.raises(RuntimeError):
+        with bank.get_connection() as conn:
+            conn.execute("UPDATE accounts SET name = 'Renamed' WHERE id = '1003'")
+            bank.transfer("1001", "1002", 50.0)
+            raise RuntimeError("caller aborts")
+    after = balances(bank)
+    assert after["1001"] == 1000.0 and after["1002"] == 2000.0
+    with bank.get_connection() as conn:
+        assert conn.execute("SELECT name FROM accounts WHERE id = '1003'").fetchone() == ("Michael Brown",)
+
+
+def test_failed_nested_transfer_keeps_the_callers_work(bank):
+    with bank.get_connection() as conn:
+        conn.execute("UPDATE accounts SET name = 'Renamed' WHERE id = '1003'")
+        with pytest.raises(TransferError):
+            bank.transfer("1001", "1002", 5000.0)
+        assert conn.in_transaction
+    with bank.get_connection() as conn:
+        assert conn.execute("SELECT name FROM accounts WHERE id = '1003'").fetchone() == ("Renamed",)
+    assert balances(bank)["1001"] == 1000.0
+
+
+def test_nested_batch_rollback_keeps_the_callers_work(bank):
+    batch = [TransferRequest(from_account_id="1001", to_account_id="1002", amount=10.0),
+             TransferRequest(from_account_id="1001", to_account_id="9999", amount=10.0)]
+    with bank.get_connection() as conn:
+        conn.execute("UPDATE accounts SET name = 'Renamed' WHERE id = '1003'")
+        results = bank.batch_transfer(batch)
+        assert [r.status for r in results] == ["rolled_back", "failed"]
+        assert conn.in_transaction
+    with bank.get_connection() as conn:
+        assert conn.execute("SELECT name FROM accounts WHERE id = '1003'").fetchone() == ("Renamed",)
+    assert balances(bank)["1001"] == 1000.0
+
+
+def test_nested_batch_leaves_commit_to_the_caller(bank):
+    batch = [TransferRequest(from_account_id="1001", to_account_id="1002", amount=10.0)]
+    with pytest.raises(RuntimeError):
+        with bank.get_connection() as conn:
+            conn.execute("UPDATE accounts SET name = 'Renamed' WHERE id = '1003'")
+            assert bank.batch_transfer(batch)[0].status == "success"
+            raise RuntimeError("caller aborts")
+    assert balances(bank)["1001"] == 1000.0
+    bank.batch_transfer(batch)
+    assert balances(bank)["1001"] == 990.0
+
+
+def test_transaction_history_pages_follow_the_full_list(bank):
+    bank.transfer("1001", "1002", 1.0)
+    history = bank.get_account_transactions("1001", limit=None)
+    assert len(history) == 2
+    page, cursor = bank.get_transaction_page("1001", limit=1)
+    assert page == history[:1]
+    assert bank.get_transaction_page("1001", limit=1, cursor=cursor)[0] == history[1:]
+
+
+@pytest.mark.parametrize("amount", [float("nan"), float("inf")])
+def test_non_finite_transfer_amounts_are_refused(bank, amount):
+    with pytest.raises(TransferError, match="finite"):
+        bank.transfer("1001", "1002", amount)
+    assert balances(bank)["1001"] == 1000.0
+
+
+@pytest.mark.parametrize("amount", [float("nan"), float("inf"), -float("inf")])
+def test_transfer_requests_reject_non_finite_amounts(amount):
+    with pytest.raises(ValueError):
+        TransferRequest(from_account_id="1001", to_account_id="1002", amount=amount)
+
+
+@pytest.mark.parametrize("all_or_nothing", [True, False])
+@pytest.mark.parametrize("amount", [float("nan"), float("inf")])
+def test_batch_marks_non_finite_amounts_failed(bank, amount, all_or_nothing):
+    # model_construct skips validation, as a caller building requests by hand might
+    batch = [TransferRequest(from_account_id="1001", to_account_id="1002", amount=10.0),
+             TransferRequest.model_construct(from_account_id="1001", to_account_id="1003",
+                                             amount=amount, description=None)]
+    results = bank.batch_transfer(batch, all_or_nothing=all_or_nothing)
+    assert results[1].status == "failed"
+    assert "finite" in results[1].error
+    after = balances(bank)
+    assert after["1003"] == 3000.0
+    if all_or_nothing:
+        assert results[0].status == "rolled_back"
+        assert after["1001"] == 1000.0
+    else:
+        assert results[0].status == "success"
+        assert after["1001"] == 990.0
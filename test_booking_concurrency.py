@@ -0,0 +1,132 @@
+"""Booking race tests: one doctor slot can only ever be booked once.
+
+Run with: python -m pytest -q test_booking_concurrency.py
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from db.async_db import async_hospital_db
+from db.hospital_db import HospitalDatabase, SlotTakenError
+from utils.encoding import ResponseEncoder
+
+THREADS = 32
+
+
+@pytest.fixture
+def hospital(tmp_path):
+    database = HospitalDatabase(str(tmp_path / "hospital.sqlite3"), pool_size=THREADS)
+    yield database
+    database.close()
+
+
+def test_concurrent_bookings_of_one_slot_have_exactly_one_winner(hospital):
+    start = threading.Barrier(THREADS)
+
+    def book(n):
+        start.wait()
+        try:
+            return hospital.create_appointment("P00%d" % (n % 5 + 1), "D001", "2030-01-07", "10:00", f"race {n}")
+        except SlotTakenError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(book, range(THREADS)))
+
+    winners = [appt_id for appt_id in results if appt_id]
+    assert len(winners) == 1
+    with hospital.get_connection() as conn:
+        rows = conn.execute(
+            "SELECT id FROM appointments WHERE doctor_id = 'D001' AND appointment_date = '2030-01-07' "
+            "AND appointment_time = '10:00' AND status != 'cancelled'"
+        ).fetchall()
+    assert rows == [(winners[0],)]
+
+
+def test_cancelled_slot_can_be_booked_again(hospital):
+    first = hospital.create_appointment("P001", "D001", "2030-01-07", "10:00", "check-up")
+    with pytest.raises(SlotTakenError):
+        hospital.create_appointment("P002", "D001", "2030-01-07", "10:00", "check-up")
+    hospital.cancel_appointment(first, "Cancelled by patient.")
+    assert hospital.create_appointment("P002", "D001", "2030-01-07", "10:00", "check-up") != first
+
+
+def test_migration_cancels_existing_double_bookings(tmp_path):
+    path = str(tmp_path / "hospital.sqlite3")
+    database = HospitalDatabase(path)
+    with database.get_connection() as conn:
+        # Roll back to the v1 schema and plant a double booking made before the constraint existed
+        conn.execute("DROP INDEX idx_appointments_active_slot")
+        conn.execute("PRAGMA user_version = 1")
+        conn.executemany(
+            "INSERT INTO appointments VALUES (?,?,?,?,?,?,?,?,?)",
+            [(appt_id, "P001", "D002", "2030-01-07", "09:00", "scheduled", "dup", "2030-01-01T00:00:00", None)
+             for appt_id in ("DUP1", "DUP2", "DUP3")],
+        )
+    database.close()
+
+    database = HospitalDatabase(path)
+    try:
+        with database.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT id, status FROM appointments WHERE id LIKE 'DUP%' ORDER BY id"
+            ).fetchall()
+        assert rows == [("DUP1", "scheduled"), ("DUP2", "cancelled"), ("DUP3", "cancelled")]
+        with pytest.raises(SlotTakenError):
+            database.create_appointment("P002", "D002", "2030-01-07", "09:00", "dup")
+    finally:
+        database.close()
+
+
+def next_working_day(hospital, doctor_id):
+    schedule = hospital.slots.schedule(doctor_id)
+    day = date.today() + timedelta(days=1)
+    while day.weekday() not in schedule.weekdays:
+        day += timedelta(days=1)
+    return day
+
+
+def test_unpadded_time_books_the_same_slot(hospital):
+    hospital.create_appointment("P001", "D001", "2030-01-07", "09:00", "check-up")
+    with pytest.raises(SlotTakenError):
+        hospital.create_appointment("P002", "D001", "2030-01-07", "9:00", "check-up")
+
+
+def test_off_grid_start_times_are_not_bookable(hospital):
+    day = next_working_day(hospital, "D001")
+    assert hospital.is_within_working_hours("D001", day, "09:00")
+    assert hospital.is_within_working_hours("D001", day, "9:30")
+    assert not hospital.is_within_working_hours("D001", day, "09:15")
+
+
+@pytest.fixture
+def booking_tool(hospital, monkeypatch):
+    import hospital_mcp_server
+
+    monkeypatch.setattr(async_hospital_db, "database", hospital)
+    monkeypatch.setattr(hospital_mcp_server, "response_encoder", ResponseEncoder("compact"))
+    tools = asyncio.run(hospital_mcp_server.mcp_hospital.get_tools())
+
+    def book(time, patient="Alice Wong"):
+        day = next_working_day(hospital, "D001")
+        return json.loads(asyncio.run(tools["hospital_book_appointment"].fn(
+            patient_name=patient, doctor_id="D001", appointment_date=str(day),
+            appointment_time=time, reason="check-up",
+        )))
+
+    return book
+
+
+def test_booking_tool_stores_canonical_times(booking_tool):
+    booked = booking_tool("9:00")
+    assert booked["time"] == "09:00"
+    assert "already has a booking" in booking_tool("09:00", patient="Bob Zhang")["error"]
+
+
+def test_booking_tool_rejects_overlapping_off_grid_times(booking_tool):
+    assert booking_tool("09:00")["time"] == "09:00"
+    assert "not a bookable start time" in booking_tool("09:15", patient="Bob Zhang")["error"]
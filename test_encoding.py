@@ -0,0 +1,100 @@
+"""Response encoder tests: every output mode encodes results and errors alike.
+
+Run with: python -m pytest -q test_encoding.py
+"""
+import asyncio
+import json
+
+import pytest
+from fastmcp.tools.tool import ToolResult
+
+from utils.encoding import ResponseEncoder, to_columnar
+
+SLOTS = {
+    "earliest": {"date": "2030-01-07", "time": "09:00"},
+    "slots": [
+        {"doctor_id": "D001", "time": "09:00", "fee": 200.0},
+        {"doctor_id": "D002", "time": "09:30", "fee": 180.0},
+    ],
+}
+
+
+def test_to_columnar_rewrites_uniform_lists():
+    assert to_columnar(SLOTS) == {
+        "earliest": {"date": "2030-01-07", "time": "09:00"},
+        "slots": {"columns": ["doctor_id", "time", "fee"], "rows": [["D001", "09:00", 200.0], ["D002", "09:30", 180.0]]},
+    }
+
+
+@pytest.mark.parametrize("value", [
+    [],
+    [1, "two", None],
+    [{"a": 1, "b": 2}, {"b": 2, "a": 1}],    # same keys, different order
+    [{"a": 1}, {"a": 1, "b": 2}],
+    [{"a": 1}, "not a dict"],
+])
+def test_to_columnar_keeps_mixed_lists(value):
+    assert to_columnar(value) == value
+
+
+def test_to_columnar_rewrites_nested_lists():
+    doctors = [
+        {"id": "D001", "days": [{"date": "2030-01-07", "free": ["09:00"]}, {"date": "2030-01-08", "free": []}]},
+        {"id": "D002", "days": [{"date": "2030-01-07", "free": ["10:00", "10:30"]}]},
+    ]
+    assert to_columnar({"doctors": doctors}) == {"doctors": {
+        "columns": ["id", "days"],
+        "rows": [
+            ["D001", {"columns": ["date", "free"], "rows": [["2030-01-07", ["09:00"]], ["2030-01-08", []]]}],
+            ["D002", {"columns": ["date", "free"], "rows": [["2030-01-07", ["10:00", "10:30"]]]}],
+        ],
+    }}
+
+
+def test_pretty_mode_indents():
+    text = ResponseEncoder("pretty").encode(SLOTS)
+    assert text.startswith('{\n  "earliest"')
+    assert json.loads(text) == SLOTS
+
+
+def test_compact_mode_has_no_whitespace():
+    text = ResponseEncoder("compact").encode({"error": "Dr. Chen Wei 已约满"})
+    assert text == '{"error":"Dr. Chen Wei 已约满"}'
+
+
+def test_columnar_mode():
+    text = ResponseEncoder("columnar").encode(SLOTS)
+    assert " " not in text and "\n" not in text
+    assert json.loads(text) == to_columnar(SLOTS)
+
+
+def test_structured_mode_returns_content_and_text():
+    result = ResponseEncoder("structured").encode(SLOTS)
+    assert isinstance(result, ToolResult)
+    assert result.structured_content == SLOTS
+    assert json.loads(result.content[0].text) == SLOTS
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="output mode"):
+        ResponseEncoder("yaml")
+
+
+@pytest.mark.parametrize("mode", ["pretty", "compact", "columnar"])
+def test_tool_errors_use_the_output_mode(mode, monkeypatch):
+    import hospital_mcp_server
+
+    encoder = ResponseEncoder(mode)
+    monkeypatch.setattr(hospital_mcp_server, "response_encoder", encoder)
+    tools = asyncio.run(hospital_mcp_server.mcp_hospital.get_tools())
+    text = asyncio.run(tools["hospital_find_available_slots"].fn(appointment_date="next monday"))
+    assert text == encoder.encode({"error": "appointment_date must be in YYYY-MM-DD format."})
+
+
+def test_structured_tool_errors_carry_structured_content(monkeypatch):
+    import hospital_mcp_server
+
+    monkeypatch.setattr(hospital_mcp_server, "response_encoder", ResponseEncoder("structured"))
+    tools = asyncio.run(hospital_mcp_server.mcp_hospital.get_tools())
+    result = asyncio.run(tools["hospital_find_available_slots"].fn(appointment_date="next monday"))
+    assert result.structured_content == {"error": "appointment_date must be in YYYY-MM-DD format."}
@@ -0,0 +1,87 @@
+"""Expense report tests: items beyond one sheet continue on sheets that carry the totals forward.
+
+Run with: python -m pytest -q test_expense_report.py
+"""
+import io
+from collections import defaultdict
+
+import openpyxl
+import pytest
+
+from reports.expense_report import CARRIED_FORWARD_LABEL, LAYOUTS, build_expense_report
+
+
+def make_items(count, categories):
+    return [
+        {"date": f"2025-01-{n % 28 + 1:02d}", "details": f"item {n}", "category": categories[n % 3], "amount": n + 0.25}
+        for n in range(count)
+    ]
+
+
+def running_totals(items, rate):
+    """Per-category RMB, total RMB and total original amount of ``items``"""
+    by_category = defaultdict(float)
+    rmb = original = 0.0
+    for item in items:
+        converted = round(item["amount"] * rate, 2)
+        by_category[item["category"]] += converted
+        rmb += converted
+        original += item["amount"]
+    return by_category, rmb, original
+
+
+@pytest.mark.parametrize("sheet_type, count, rate, expected_sheets", [
+    ("local", 70, 1.0, 3),      # 30 + 29 + 11
+    ("overseas", 80, 7.25, 3),  # 34 + 33 + 13
+])
+def test_overflow_sheets_carry_totals_forward(sheet_type, count, rate, expected_sheets):
+    layout = LAYOUTS[sheet_type]
+    items = make_items(count, layout.categories)
+    result = build_expense_report({
+        "name": "Ann", "period": "2025-Jan", "sheet_type": sheet_type, "items": items,
+        "exchange_rate": rate, "original_currency": "USD",
+    })
+    assert result["status"] == "success"
+    assert result["sheets"] == expected_sheets
+    assert result["rows_filled"] == count
+
+    wb = openpyxl.load_workbook(io.BytesIO(result["content"]))
+    names = [layout.sheet_name] + [f"{layout.sheet_name} ({page})" for page in range(2, expected_sheets + 1)]
+    assert [name for name in wb.sheetnames if name.startswith(layout.sheet_name)] == names
+
+    row = layout.first_row
+    written = layout.rows_per_sheet
+    for page, name in enumerate(names[1:], start=2):
+        ws = wb[name]
+        carried, carried_rmb, carried_original = running_totals(items[:written], rate)
+        assert ws[f"A{row}"].value == CARRIED_FORWARD_LABEL
+        assert ws[f"B{row}"].value == f"第 1–{page - 1} 页合计"
+        assert ws[f"D{row}"].value == pytest.approx(carried_original)
+        assert ws[f"{layout.rmb_column}{row}"].value == pytest.approx(carried_rmb)
+        for column, category in layout.category_columns.items():
+            assert ws[f"{column}{row}"].value == pytest.approx(carried[category])
+        # The first item after the carried-forward row picks up where the previous sheet stopped
+        assert ws[f"B{row + 1}"].value == items[written]["details"]
+        written += layout.rows_per_sheet - 1
+
+    subtotals, total, _ = running_totals(items, rate)
+    assert result["subtotals"] == pytest.approx({category: subtotals[category] for category in layout.categories})
+    assert result["total"] == pytest.approx(total)
+
+    # The last sheet's carried-forward row plus its own rows add up to the grand totals
+    last = wb[names[-1]]
+    last_rows = [last[f"D{r}"].value for r in range(row + 1, row + layout.rows_per_sheet)]
+    assert sum(amount for amount in last_rows if amount is not None) + last[f"D{row}"].value == pytest.approx(
+        sum(item["amount"] for item in items))
+
+
+def test_single_sheet_report_has_no_carried_forward_row():
+    layout = LAYOUTS["local"]
+    result = build_expense_report({
+        "name": "Ann", "period": "2025-Jan", "sheet_type": "local",
+        "items": make_items(layout.rows_per_sheet, layout.categories),
+    })
+    assert result["sheets"] == 1
+    ws = openpyxl.load_workbook(io.BytesIO(result["content"]))[layout.sheet_name]
+    assert ws[f"B{layout.first_row}"].value == "item 0"
+    assert ws[f"A{layout.first_row}"].value != CARRIED_FORWARD_LABEL
@@ -0,0 +1,105 @@
+"""Patient search tests: the FTS indexes follow the patients table, including across VACUUM.
+
+Run with: python -m pytest -q test_patient_search.py
+"""
+import pytest
+
+from db.hospital_db import HospitalDatabase
+
+
+@pytest.fixture
+def hospital(tmp_path):
+    database = HospitalDatabase(str(tmp_path / "hospital.sqlite3"))
+    yield database
+    database.close()
+
+
+def add_patient(conn, patient_id, name, phone):
+    conn.execute(
+        "INSERT INTO patients (id, name, date_of_birth, gender, phone, id_number) VALUES (?, ?, ?, ?, ?, ?)",
+        (patient_id, name, "1990-01-01", "Female", phone, "ID" + patient_id),
+    )
+
+
+def found_ids(hospital, query):
+    return [row[0] for row in hospital.search_patients(query)]
+
+
+def index_contents(hospital):
+    with hospital.get_connection() as conn:
+        return (
+            sorted(conn.execute("SELECT patient_id, name, phone_tail FROM patients_fts")),
+            sorted(conn.execute("SELECT patient_id, name FROM patients_trigram")),
+            sorted(conn.execute("SELECT id, name, substr(replace(replace(phone, '-', ''), ' ', ''), -4) FROM patients")),
+        )
+
+
+def test_triggers_follow_inserts_updates_and_deletes(hospital):
+    with hospital.get_connection() as conn:
+        add_patient(conn, "T001", "Quentin Marsh", "150-1234-5678")
+    assert found_ids(hospital, "Quentin Marsh") == ["T001"]
+
+    with hospital.get_connection() as conn:
+        conn.execute("UPDATE patients SET name = 'Quentin Moor', phone = '150-1234-9999' WHERE id = 'T001'")
+    assert found_ids(hospital, "Marsh") == []
+    assert found_ids(hospital, "Moor") == ["T001"]
+    assert found_ids(hospital, "9999") == ["T001"]
+
+    with hospital.get_connection() as conn:
+        conn.execute("DELETE FROM patients WHERE id = 'T001'")
+    assert found_ids(hospital, "Moor") == []
+    fts, trigram, patients = index_contents(hospital)
+    assert fts == patients
+    assert trigram == [row[:2] for row in patients]
+
+
+def test_triggers_stay_correct_after_vacuum_renumbers_rowids(hospital):
+    with hospital.get_connection() as conn:
+        for n in range(20):
+            add_patient(conn, f"V{n:03d}", f"Vacuum Patient{n}", f"150-0000-{n:04d}")
+        conn.execute("DELETE FROM patients WHERE id < 'V010'")
+    with hospital.get_connection() as conn:
+        # What VACUUM may do to a table without an INTEGER PRIMARY KEY; the update trigger does not fire
+        conn.execute("UPDATE patients SET rowid = rowid + 1000")
+
+    with hospital.get_connection() as conn:
+        conn.execute("UPDATE patients SET name = 'Renamed Person' WHERE id = 'V015'")
+        conn.execute("DELETE FROM patients WHERE id = 'V012'")
+        add_patient(conn, "V999", "Newcomer Person", "150-0000-9999")
+
+    assert found_ids(hospital, "Renamed") == ["V015"]
+    assert found_ids(hospital, "Newcomer") == ["V999"]
+    fts, trigram, patients = index_contents(hospital)
+    assert fts == patients
+    assert trigram == [row[:2] for row in patients]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Alice Wong", ["P001"]),
+    ("alice", ["P001"]),
+    ("Caro", ["P003"]),
+    ("Alise Wnog", ["P001"]),
+    ("Bbo Zhang", ["P002"]),
+    ("Alice Wang", ["P001"]),
+    ("0001", ["P001"]),
+    ("138-0001-0001", ["P001"]),
+])
+def test_search_returns_only_relevant_patients(hospital, query, expected):
+    assert found_ids(hospital, query) == expected
+
+
+@pytest.mark.parametrize("query", ["anguo", "Cardiology", "139-0002-0001", "12", "Zebediah"])
+def test_search_without_a_close_match_returns_nothing(hospital, query):
+    assert hospital.search_patients(query) == []
+
+
+def test_phone_queries_never_match_names(hospital):
+    with hospital.get_connection() as conn:
+        add_patient(conn, "T100", "Agent 0047", "150-1111-2222")
+    assert found_ids(hospital, "0047") == []
+    assert found_ids(hospital, "2222") == ["T100"]
+
+
+def test_doctor_search_drops_unrelated_specialties(hospital):
+    assert [row[2] for row in hospital.search_doctors("Pediatrcs")] == ["Pediatrics"]
+    assert [row[2] for row in hospital.search_doctors("Cardiology")] == ["Cardiology"]
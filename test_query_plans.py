@@ -0,0 +1,141 @@
+"""Query-plan regression tests: every hot query must be served by an index.
+
+The SQL is captured from the real Database/HospitalDatabase methods through
+a trace callback, so the assertions follow the code instead of a copy of it.
+
+Run with: python -m pytest -q test_query_plans.py
+"""
+from datetime import date
+
+import pytest
+
+from db.database import Database
+from db.hospital_db import HospitalDatabase
+
+
+@pytest.fixture
+def bank(tmp_path):
+    database = Database(str(tmp_path / "bank.sqlite3"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def hospital(tmp_path):
+    database = HospitalDatabase(str(tmp_path / "hospital.sqlite3"))
+    yield database
+    database.close()
+
+
+def query_plans(database, call):
+    """Run ``call`` and return the EXPLAIN QUERY PLAN lines of each statement it issued."""
+    statements = []
+    with database.get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert selects, "call issued no SELECT statements"
+        return [
+            [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            for sql in selects
+        ]
+
+
+def assert_indexed(plans, *indexes):
+    details = [line for plan in plans for line in plan]
+    scans = [line for line in details if line.startswith("SCAN")]
+    assert not scans, f"full scan in query plan: {details}"
+    for index in indexes:
+        assert any(index in line for line in details), f"{index} not used: {details}"
+
+
+# ── Banking ───────────────────────────────────────────────────────────────────
+
+def test_account_transactions_use_account_indexes(bank):
+    plans = query_plans(bank, lambda: bank.get_account_transactions("1001"))
+    assert_indexed(plans, "idx_transactions_from_account", "idx_transactions_to_account")
+    assert not any("TEMP B-TREE" in line for plan in plans for line in plan)
+
+
+def test_transaction_page_keyset_merges_index_order(bank):
+    _, cursor = bank.get_transaction_page("1002", limit=1)
+    plans = query_plans(bank, lambda: bank.get_transaction_page("1002", limit=5, cursor=cursor))
+    assert_indexed(plans, "MERGE (UNION ALL)", "(timestamp,id)<(?,?)")
+    assert not any("TEMP B-TREE" in line for plan in plans for line in plan)
+
+
+def test_account_by_name_uses_index(bank):
+    plans = query_plans(bank, lambda: bank.get_account_by_name("John Smith"))
+    assert_indexed(plans, "idx_accounts_name")
+
+
+def test_user_investments_use_index_without_sort(bank):
+    plans = query_plans(bank, lambda: bank.get_user_investments("1001"))
+    assert_indexed(plans, "idx_user_investments_account")
+    assert not any("TEMP B-TREE" in line for plan in plans for line in plan)
+
+
+def test_financial_products_use_status_index(bank):
+    plans = query_plans(bank, bank.get_financial_products)
+    assert_indexed(plans, "idx_financial_products_status")
+
+
+# ── Hospital ──────────────────────────────────────────────────────────────────
+
+def test_appointment_conflict_uses_slot_index(hospital):
+    plans = query_plans(
+        hospital, lambda: hospital.check_appointment_conflict("D001", "2030-01-01", "10:00")
+    )
+    assert_indexed(plans, "idx_appointments_active_slot")
+
+
+def test_doctor_bookings_use_active_slot_index(hospital):
+    plans = query_plans(hospital, lambda: hospital.get_doctor_bookings("D001"))
+    assert_indexed(plans, "idx_appointments_active_slot")
+
+
+@pytest.mark.parametrize("kwargs", [{"specialty": "cardiology"}, {"doctor_ids": ["D001", "D003"]}])
+def test_multi_doctor_schedules_use_indexes(hospital, kwargs):
+    plans = query_plans(hospital, lambda: hospital.get_schedules(date(2030, 1, 1), date(2030, 1, 7), **kwargs))
+    assert_indexed(plans, "idx_appointments_active_slot")
+
+
+def test_slot_engine_loads_the_horizon_with_one_indexed_query(hospital):
+    hospital.slots.invalidate()
+    plans = query_plans(hospital, lambda: hospital.find_available_slots("Cardiology"))
+    bookings = [plan for plan in plans if any("appointments" in line for line in plan)]
+    assert len(bookings) == 1
+    assert_indexed(bookings, "idx_appointments_active_date")
+
+
+def test_doctors_by_specialty_use_expression_index(hospital):
+    plans = query_plans(hospital, lambda: hospital.get_doctors("cardiology"))
+    assert_indexed(plans, "idx_doctors_specialty")
+
+
+@pytest.mark.parametrize("lookup", [
+    lambda db: db.get_patient("alice wong"),
+    lambda db: db.get_patient_by_name("ALICE WONG"),
+    lambda db: db.patient_exists("Alice Wong", "110101198503120011"),
+])
+def test_patient_name_lookups_use_expression_index(hospital, lookup):
+    plans = query_plans(hospital, lambda: lookup(hospital))
+    assert_indexed(plans, "idx_patients_name")
+
+
+@pytest.mark.parametrize("status_filter", ["all", "scheduled"])
+def test_patient_appointments_use_patient_index(hospital, status_filter):
+    plans = query_plans(hospital, lambda: hospital.get_patient_appointments("P001", status_filter))
+    assert_indexed(plans, "idx_appointments_patient")
+
+
+def test_migrations_are_versioned(bank, hospital):
+    for database in (bank, hospital):
+        with database.get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        assert version == len(database.MIGRATIONS)
+        # Re-running init_database must be a no-op for an up-to-date schema
+        database.init_database()
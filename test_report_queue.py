@@ -0,0 +1,61 @@
+"""Report queue tests: bulk jobs are admitted by the number of reports they fan out to.
+
+Run with: python -m pytest -q test_report_queue.py
+"""
+import asyncio
+
+import pytest
+
+from reports.job_queue import JobQueue, QueueFullError
+from schemas.expense_models import validate_report_spec
+
+
+def test_bulk_job_counts_each_item_against_admission():
+    async def run():
+        queue = JobQueue(max_workers=2, max_pending=3)
+        release = asyncio.Event()
+        try:
+            bulk = queue.submit_task(release.wait, weight=4)
+            assert queue.backlog() == 4
+            queue.submit_task(release.wait)
+            with pytest.raises(QueueFullError, match="full"):
+                queue.submit_task(release.wait)
+            release.set()
+            await queue.wait(bulk.id)
+            assert queue.backlog() <= 1
+        finally:
+            queue.shutdown()
+
+    asyncio.run(run())
+
+
+def test_bulk_job_larger_than_the_queue_is_rejected_outright():
+    async def run():
+        queue = JobQueue(max_workers=2, max_pending=3)
+        try:
+            with pytest.raises(QueueFullError, match="smaller batches"):
+                queue.submit_task(asyncio.sleep, weight=6)
+            assert queue.backlog() == 0
+        finally:
+            queue.shutdown()
+
+    asyncio.run(run())
+
+
+def test_report_spec_fields_are_coerced():
+    spec, errors = validate_report_spec({"name": " Ann ", "period": "2025-Jan", "items": "[]",
+                                         "exchange_rate": "7.25", "unknown": 1})
+    assert errors == []
+    assert spec == {"name": "Ann", "period": "2025-Jan", "items": "[]", "exchange_rate": 7.25}
+
+
+@pytest.mark.parametrize("report, field", [
+    ({"name": "Ann", "period": "2025-Jan", "items": "[]", "exchange_rate": "seven"}, "exchange_rate"),
+    ({"name": "Ann", "period": "2025-Jan", "items": "[]", "exchange_rate": "nan"}, "exchange_rate"),
+    ({"name": "Ann", "items": "[]"}, "period"),
+    ("not a spec", "report"),
+])
+def test_invalid_report_specs_are_reported(report, field):
+    spec, errors = validate_report_spec(report)
+    assert spec == {}
+    assert errors and errors[0].startswith(field + ":")
@@ -0,0 +1,55 @@
+"""ResilientCaller tests: responses dropped for a retry are handed back to the caller to close.
+
+Run with: python -m pytest -q test_resilience.py
+"""
+import asyncio
+
+import httpx
+
+from clients.resilience import ResilientCaller
+from schemas.models import ResiliencePolicy, RetryPolicy
+
+
+class TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, opened):
+        self.closed = False
+        opened.append(self)
+
+    async def __aiter__(self):
+        yield b"data: {}\n\n"
+
+    async def aclose(self):
+        self.closed = True
+
+
+def stream_through(statuses):
+    """Open a stream through a ResilientCaller, the way APIClient.stream_request does"""
+    opened = []
+    replies = iter(statuses)
+    transport = httpx.MockTransport(lambda request: httpx.Response(next(replies), stream=TrackedStream(opened)))
+    caller = ResilientCaller("test", ResiliencePolicy(retry=RetryPolicy(max_attempts=3, backoff_base=0)))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            request = client.build_request("GET", "http://upstream.test/stream")
+            response = await caller.call(
+                "GET", lambda: client.send(request, stream=True), hedge=False,
+                on_discard=lambda discarded: discarded.aclose(),
+            )
+            closed = [stream.closed for stream in opened]
+            await response.aclose()
+            return response.status_code, closed
+
+    return asyncio.run(run())
+
+
+def test_discarded_stream_attempts_are_closed():
+    status, closed = stream_through([503, 502, 200])
+    assert status == 200
+    assert closed == [True, True, False]
+
+
+def test_last_attempt_is_returned_open_when_retries_run_out():
+    status, closed = stream_through([503, 503, 503])
+    assert status == 503
+    assert closed == [True, True, False]
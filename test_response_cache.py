@@ -0,0 +1,99 @@
+"""Single-flight coalescing tests for ResponseCache.
+
+Run with: python -m pytest -q test_response_cache.py
+"""
+import asyncio
+
+import pytest
+
+from clients.response_cache import ResponseCache
+
+
+def test_concurrent_callers_share_one_fetch():
+    async def scenario():
+        cache = ResponseCache()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "body"
+
+        results = await asyncio.gather(*(cache.coalesce("k", fetch) for _ in range(5)))
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == ["body"] * 5
+    assert cache.coalesced == 4
+    assert cache.stats()["inflight"] == 0
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def scenario():
+        cache = ResponseCache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "body"
+
+        leader = asyncio.create_task(cache.coalesce("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.coalesce("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, calls, cache
+
+    result, calls, cache = asyncio.run(scenario())
+    assert result == "body"
+    assert calls == 1
+    assert cache.stats()["inflight"] == 0
+
+
+def test_fetch_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        cache = ResponseCache()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(cache.coalesce("k", fetch)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.stats()["inflight"] == 0
+
+
+def test_fetch_error_reaches_every_caller():
+    async def scenario():
+        cache = ResponseCache()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        return await asyncio.gather(*(cache.coalesce("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,123 @@
+"""Slot engine tests: find() answers from the in-memory index and tracks bookings.
+
+Run with: python -m pytest -q test_slot_engine.py
+"""
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import db.hospital_db
+from db.async_db import async_hospital_db
+from db.hospital_db import HospitalDatabase
+from utils.encoding import ResponseEncoder
+
+
+@pytest.fixture
+def hospital(tmp_path):
+    database = HospitalDatabase(str(tmp_path / "hospital.sqlite3"))
+    with database.get_connection() as conn:
+        # Works every day, so tests do not depend on today's weekday
+        conn.execute(
+            "INSERT INTO doctors VALUES ('D900', 'Dr. Test', 'Testing', 'Attending Physician', "
+            "'City Central Hospital', 'Mon,Tue,Wed,Thu,Fri,Sat,Sun', '08:00-17:00', 100.0)"
+        )
+    database.invalidate_reference_cache()
+    yield database
+    database.close()
+
+
+def times(slots):
+    return [slot_time for _, _, slot_time in slots]
+
+
+def doctor_ids(schedules):
+    return sorted(s["schedule"].doctor_id for s in schedules)
+
+
+def test_off_grid_booking_blocks_both_neighbouring_slots(hospital):
+    day = str(date.today() + timedelta(days=1))
+    with hospital.get_connection() as conn:
+        # A booking made before off-grid starts were refused
+        conn.execute(
+            "INSERT INTO appointments VALUES ('LEGACY', 'P001', 'D900', ?, '09:15', 'scheduled', "
+            "'legacy', '2030-01-01T00:00:00', NULL)", (day,)
+        )
+    hospital.slots.invalidate()
+    free = times(hospital.find_available_slots(doctor_id="D900", on_date=date.fromisoformat(day), limit=50))
+    assert free[:3] == ["08:00", "08:30", "10:00"]
+    assert "09:00" not in free and "09:30" not in free
+
+
+def test_slots_that_already_started_today_are_excluded(hospital, monkeypatch):
+    class LunchTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.combine(date.today(), datetime.min.time()).replace(hour=12, minute=10)
+
+    monkeypatch.setattr(db.hospital_db, "datetime", LunchTime)
+    today = hospital.find_available_slots(doctor_id="D900", on_date=date.today(), limit=50)
+    assert times(today)[0] == "12:30"
+    assert all(slot_date == str(date.today()) for _, slot_date, _ in today)
+    earliest = hospital.find_available_slots(doctor_id="D900", limit=1)
+    assert [(slot_date, slot_time) for _, slot_date, slot_time in earliest] == [(str(date.today()), "12:30")]
+
+
+def test_booking_and_cancelling_update_free_slots(hospital):
+    day = date.today() + timedelta(days=1)
+    assert times(hospital.find_available_slots(doctor_id="D900", on_date=day, limit=1)) == ["08:00"]
+    appt_id = hospital.create_appointment("P001", "D900", str(day), "08:00", "check-up")
+    assert times(hospital.find_available_slots(doctor_id="D900", on_date=day, limit=1)) == ["08:30"]
+    hospital.cancel_appointment(appt_id, "Cancelled by patient.")
+    assert times(hospital.find_available_slots(doctor_id="D900", on_date=day, limit=1)) == ["08:00"]
+
+
+def test_find_filters_by_specialty_and_doctor(hospital):
+    cardiology = hospital.find_available_slots(specialty=" cardiology ", limit=20)
+    assert cardiology and {schedule.doctor_id for schedule, _, _ in cardiology} == {"D001"}
+    assert [(d, t) for _, d, t in cardiology] == sorted((d, t) for _, d, t in cardiology)
+    assert {s.doctor_id for s, _, _ in hospital.find_available_slots(doctor_id=" D003 ", limit=20)} == {"D003"}
+    assert hospital.find_available_slots(specialty="Cardiology", doctor_id="D003") == []
+    assert hospital.find_available_slots(specialty="Astrology") == []
+    assert hospital.find_available_slots(doctor_id="D999") == []
+
+
+def test_get_schedules_filters_by_doctor_ids(hospital):
+    start = date.today() + timedelta(days=1)
+    end = start + timedelta(days=6)
+    assert doctor_ids(hospital.get_schedules(start, end, doctor_ids=["D003", " D001"])) == ["D001", "D003"]
+    assert doctor_ids(hospital.get_schedules(start, end, "Cardiology", ["D001", "D003"])) == ["D001"]
+    assert doctor_ids(hospital.get_schedules(start, end, "Testing")) == ["D900"]
+    assert len(hospital.get_schedules(start, end)) == 9
+
+
+def test_find_is_limited_to_the_horizon(hospital):
+    horizon = hospital.slots.horizon_days
+    last_day = date.today() + timedelta(days=horizon - 1)
+    assert hospital.find_available_slots(doctor_id="D900", on_date=last_day)
+    assert hospital.find_available_slots(doctor_id="D900", on_date=last_day + timedelta(days=1)) == []
+
+
+@pytest.fixture
+def find_tool(hospital, monkeypatch):
+    import hospital_mcp_server
+
+    monkeypatch.setattr(async_hospital_db, "database", hospital)
+    monkeypatch.setattr(hospital_mcp_server, "response_encoder", ResponseEncoder("compact"))
+    tools = asyncio.run(hospital_mcp_server.mcp_hospital.get_tools())
+
+    def find(appointment_date):
+        return json.loads(asyncio.run(tools["hospital_find_available_slots"].fn(
+            doctor_id="D900", appointment_date=appointment_date,
+        )))
+
+    return find
+
+
+def test_find_tool_validates_dates_against_the_horizon(hospital, find_tool):
+    last_day = date.today() + timedelta(days=hospital.slots.horizon_days - 1)
+    assert find_tool(str(last_day))["earliest"] == {"doctor_id": "D900", "date": str(last_day), "time": "08:00"}
+    assert f"on or before {last_day}" in find_tool(str(last_day + timedelta(days=1)))["error"]
+    assert "cannot be in the past" in find_tool(str(date.today() - timedelta(days=1)))["error"]
+    assert "YYYY-MM-DD" in find_tool("next monday")["error"]
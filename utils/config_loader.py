@@ -1,7 +1,7 @@
 import yaml
 from typing import Dict, Any
 from pathlib import Path
-from schemas.models import ConfigModel
+from schemas.models import APIConfig, ConfigModel, RequestPlan
 import re
 import os
 
@@ -41,6 +41,15 @@ class ConfigLoader:
             self.load_config()
         return {api.name: api.model_dump() for api in self.config.apis}
     
+    def get_api_config(self, api_name: str) -> APIConfig:
+        """Get a single API configuration model by name"""
+        if self.config is None:
+            self.load_config()
+        for api_config in self.config.apis:
+            if api_config.name == api_name:
+                return api_config
+        raise ValueError(f"No API configuration named: {api_name}")
+    
     def get_endpoint_by_tool_name(self, tool_name: str) -> Dict[str, Any]:
         """Find endpoint configuration by tool name"""
         if self.config is None:
@@ -55,6 +64,35 @@ class ConfigLoader:
                     }
         
         raise ValueError(f"No endpoint found for tool name: {tool_name}")
+    
+    def build_request_plans(self) -> Dict[str, RequestPlan]:
+        """Compile every configured endpoint into a request plan keyed by tool name"""
+        if self.config is None:
+            self.load_config()
+        
+        plans = {}
+        for api_config in self.config.apis:
+            for endpoint in api_config.endpoints:
+                if endpoint.tool_name in plans:
+                    raise ValueError(f"Duplicate tool name in configuration: {endpoint.tool_name}")
+                method = endpoint.method.upper()
+                if method not in ("GET", "POST"):
+                    raise ValueError(f"Unsupported HTTP method for {endpoint.tool_name}: {method}")
+                if endpoint.stream_format not in (None, "sse", "ndjson"):
+                    raise ValueError(f"Unsupported stream_format for {endpoint.tool_name}: {endpoint.stream_format}")
+                plans[endpoint.tool_name] = RequestPlan(
+                    tool_name=endpoint.tool_name,
+                    api_name=api_config.name,
+                    method=method,
+                    url=f"{api_config.base_url}{endpoint.path}",
+                    headers={**(api_config.headers or {}), **(endpoint.headers or {})},
+                    static_params=endpoint.static_params or {},
+                    parameters=tuple(endpoint.parameters or ()),
+                    description=endpoint.description,
+                    cache_ttl=endpoint.cache_ttl if method == "GET" and not endpoint.stream_format else None,
+                    stream_format=endpoint.stream_format,
+                )
+        return plans
 
 
 # Singleton configuration loader instance
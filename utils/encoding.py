@@ -0,0 +1,60 @@
+import json
+from typing import Any, Dict
+
+try:
+    import orjson  # optional, several times faster than json.dumps
+except ImportError:
+    orjson = None
+
+# pretty:     indented JSON text (the original format)
+# compact:    JSON text without whitespace
+# columnar:   compact, and every list of same-shaped objects becomes {"columns": [...], "rows": [[...]]}
+# structured: MCP structured content (the object itself) plus the compact text for older clients
+OUTPUT_MODES = ("pretty", "compact", "columnar", "structured")
+
+
+def dumps(data: Any, pretty: bool = False) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+_NESTED = (dict, list)
+
+
+def to_columnar(value: Any) -> Any:
+    """Rewrite lists of dicts sharing the same keys (in the same order) as a column list plus row arrays, recursively"""
+    if type(value) is dict:
+        return {key: to_columnar(item) if isinstance(item, _NESTED) else item for key, item in value.items()}
+    if not value or type(value[0]) is not dict:
+        return [to_columnar(item) if isinstance(item, _NESTED) else item for item in value]
+    columns = list(value[0])
+    rows = []
+    for item in value:
+        if type(item) is not dict or list(item) != columns:
+            return [to_columnar(item) if isinstance(item, _NESTED) else item for item in value]
+        rows.append([to_columnar(cell) if isinstance(cell, _NESTED) else cell for cell in item.values()])
+    return {"columns": columns, "rows": rows}
+
+
+class ResponseEncoder:
+    """Turns a tool's result dict into the response for the configured output mode"""
+
+    def __init__(self, mode: str = "pretty"):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"output mode must be one of {', '.join(OUTPUT_MODES)}, got {mode!r}")
+        self.mode = mode
+
+    def encode(self, data: Dict[str, Any]):
+        if self.mode == "pretty":
+            return dumps(data, pretty=True)
+        if self.mode == "columnar":
+            return dumps(to_columnar(data))
+        text = dumps(data)
+        if self.mode == "structured":
+            from fastmcp.tools.tool import ToolResult
+
+            return ToolResult(content=text, structured_content=data)
+        return text